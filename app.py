@@ -1,17 +1,88 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, flash
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, flash, Response, stream_with_context
 from datetime import datetime, timedelta
 import heapq
-import pandas as pd
-from collections import defaultdict, deque
+from collections import deque
 from models import db, Item, User
+from snapshot import get_snapshot, peek_snapshot, invalidate_snapshot, expiry_key, query_top_expiring
+from surplus import SurplusEngine
+from recommend import build_recommendations
+from bulk import import_stream, export_items, detect_format, FORMATS, DEFAULT_BATCH_SIZE
+from bulk import delete_items, update_quantities, parse_ids
+from rollup import get_rollups, reconcile_rollups, record_added as record_rollup_added
+from expiry import sweep_expiry, expiry_status
+from scheduler import Scheduler
+from cache import ViewCache, bump_inventory_version
+from pagination import inventory_page, item_status, serialize_item, InvalidCursor, DEFAULT_PAGE_SIZE, STATUSES
+from metrics import Metrics
+import database
+from forecast import Forecaster, at_risk_items
+from events import EventBroker, ITEM_ADDED, ITEMS_REMOVED, ITEMS_UPDATED, CHANGED
 from werkzeug.security import generate_password_hash, check_password_hash
+import io
 import os
+import tempfile
 
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///waste_tracker.db')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'supersecretkey')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['SURPLUS_WINDOW_DAYS'] = int(os.environ.get('SURPLUS_WINDOW_DAYS', 7))
+app.config['SURPLUS_THRESHOLD'] = int(os.environ.get('SURPLUS_THRESHOLD', 10))
+app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+app.config['SCHEDULER_LOCK_FILE'] = os.environ.get('SCHEDULER_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'smart-waste-tracker-scheduler.lock'))
+app.config['EXPIRY_SWEEP_INTERVAL'] = int(os.environ.get('EXPIRY_SWEEP_INTERVAL', 60))
+app.config['ROLLUP_RECONCILE_INTERVAL'] = int(os.environ.get('ROLLUP_RECONCILE_INTERVAL', 3600))
+app.config['CACHE_ENABLED'] = os.environ.get('CACHE_ENABLED', '1') == '1'
+app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+app.config['CACHE_TTL'] = int(os.environ.get('CACHE_TTL', 60))
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+app.config['FORECAST_ENABLED'] = os.environ.get('FORECAST_ENABLED', '1') == '1'
+app.config['FORECAST_INTERVAL'] = int(os.environ.get('FORECAST_INTERVAL', 300))
+app.config['FORECAST_REFIT_INTERVAL'] = int(os.environ.get('FORECAST_REFIT_INTERVAL', 6 * 3600))
+app.config['FORECAST_LOOKBACK_DAYS'] = int(os.environ.get('FORECAST_LOOKBACK_DAYS', 90))
+app.config['FORECAST_PROCESSES'] = int(os.environ.get('FORECAST_PROCESSES', 1))
+app.config['EVENTS_ENABLED'] = os.environ.get('EVENTS_ENABLED', '1') == '1'
+app.config['EVENTS_POLL_INTERVAL'] = int(os.environ.get('EVENTS_POLL_INTERVAL', 5))
+app.config['EVENTS_HEARTBEAT'] = int(os.environ.get('EVENTS_HEARTBEAT', 15))
+app.config['EVENTS_STREAM_SECONDS'] = int(os.environ.get('EVENTS_STREAM_SECONDS', 25))
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '0') == '1'
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') == '1'
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')
+app.config['METRICS_FLUSH_INTERVAL'] = int(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+database.init_app(app)
+surplus_engine = SurplusEngine()
+surplus_engine.init_app(app)
+view_cache = ViewCache()
+view_cache.init_app(app)
+metrics = Metrics()
+metrics.init_app(app)
+forecaster = Forecaster()
+forecaster.init_app(app)
+events = EventBroker()
+events.init_app(app)
+scheduler = Scheduler(app, app.config['SCHEDULER_LOCK_FILE'], tick=app.config['EXPIRY_SWEEP_INTERVAL'])
+scheduler.add_job('expiry-sweep', sweep_expiry, app.config['EXPIRY_SWEEP_INTERVAL'])
+scheduler.add_job('reconcile-rollups', reconcile_rollups, app.config['ROLLUP_RECONCILE_INTERVAL'])
+if app.config['FORECAST_ENABLED']:
+    scheduler.add_job('forecast-waste', forecaster, app.config['FORECAST_INTERVAL'])
+
+def start_background_jobs():
+    """Start the scheduler thread; called once per worker process (see gunicorn.conf.py)."""
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.start()
+
+def stop_background_jobs():
+    """Stop the scheduler and the forecast process pool; called on worker exit."""
+    scheduler.stop()
+    # The pool's management thread lives where the forecast job ran
+    scheduler.call(forecaster.shutdown)
 
 def login_required(f):
     from functools import wraps
@@ -59,55 +130,95 @@ def logout():
     return redirect(url_for('login'))
 
 # --- DSA Structures ---
+# The whole-inventory structures below are derived from the request's inventory
+# snapshot, so code that uses several of them loads the user's items only once.
+# The views themselves no longer need every item: they read top-k queries, the
+# category rollup and the surplus engine, and use the snapshot only when a
+# request has already loaded it (bench_micro.py times both paths).
+
 # Hash map for category lookup
-def get_category_map():
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    category_map = defaultdict(list)
-    for item in items:
-        category_map[item.category].append(item)
-    return category_map
+def get_category_map(snapshot=None):
+    with metrics.stage('category_map'):
+        snapshot = snapshot or get_snapshot()
+        return snapshot.category_map()
 
 # Priority queue for soon-to-expire items
-def get_expiry_queue():
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    pq = []
-    for item in items:
-        heapq.heappush(pq, (item.expiry_date, item))
-    return pq
-
-# Sliding window for demand forecasting
-def forecast_surplus(window_days=7):
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    df = pd.DataFrame([
-        {'name': i.name, 'category': i.category, 'quantity': i.quantity, 'added_date': i.added_date} for i in items
-    ])
-    if df.empty:
-        return []
-    df['added_date'] = pd.to_datetime(df['added_date'])
-    now = datetime.now()
-    window_start = now - timedelta(days=window_days)
-    recent = df[df['added_date'] >= window_start]
-    surplus = recent.groupby('name').sum(numeric_only=True)
-    # If quantity added in window > threshold, flag as surplus
-    surplus_items = surplus[surplus['quantity'] > 10].index.tolist()  # threshold=10 for demo
-    return surplus_items
+def get_expiry_queue(snapshot=None):
+    with metrics.stage('expiry_queue'):
+        snapshot = snapshot or get_snapshot()
+        pq = [(*expiry_key(item), item) for item in snapshot]
+        heapq.heapify(pq)
+        return pq
+
+# Top-K soon-to-expire items: ORDER BY ... LIMIT k in the database, or a
+# bounded heap over the snapshot when this request has already loaded it
+def get_soon_expiring(k):
+    with metrics.stage('expiry_queue'):
+        snapshot = peek_snapshot()
+        if snapshot is not None:
+            return snapshot.top_expiring(k)
+        return query_top_expiring(session['user_id'], k)
+
+# Sliding window for demand forecasting, maintained incrementally by the
+# write routes below (see surplus.py)
+def forecast_surplus():
+    with metrics.stage('forecast'):
+        return surplus_engine.surplus_items(session['user_id'])
 
 # --- Routes ---
+# Views below cache their data and heavy fragments per user, keyed by the
+# inventory version that every write path bumps (see cache.py)
 @app.route('/')
 @login_required
+@view_cache.conditional('dashboard')
 def dashboard():
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    surplus = forecast_surplus()
-    expiry_pq = get_expiry_queue()
-    soon_expiring = [heapq.heappop(expiry_pq)[1] for _ in range(min(5, len(expiry_pq)))]
-    return render_template('dashboard.html', items=items, surplus=surplus, soon_expiring=soon_expiring, now=datetime.now(), timedelta=timedelta)
+    fragments = dashboard_fragments(session['user_id'])
+    return render_template('dashboard.html', fragments=fragments, now=datetime.now(), timedelta=timedelta)
+
+def dashboard_fragments(user_id):
+    return {
+        'surplus_list': view_cache.fragment(user_id, 'surplus_list', '_surplus_list.html',
+                                            lambda: {'surplus': forecast_surplus()}),
+        'soon_expiring_list': view_cache.fragment(user_id, 'soon_expiring_list', '_soon_expiring_list.html',
+                                                  lambda: {'soon_expiring': get_soon_expiring(5)}),
+    }
+
+@app.route('/dashboard/fragments')
+@login_required
+def dashboard_fragments_json():
+    # Refetched by the dashboard when /events reports a change
+    return jsonify({name: str(html) for name, html in dashboard_fragments(session['user_id']).items()})
 
 @app.route('/inventory')
 @login_required
+@view_cache.conditional('inventory')
 def inventory():
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    surplus = forecast_surplus()
-    return render_template('inventory.html', items=items, surplus=surplus, now=datetime.now(), timedelta=timedelta)
+    # Rows are fetched page by page from /api/items; only the summary is rendered here
+    user_id = session['user_id']
+    counts = view_cache.cached(user_id, 'category_counts',
+                               lambda: {r.category: r.item_count for r in get_rollups(user_id)})
+    return render_template('inventory.html', total_items=sum(counts.values()), category_counts=counts, page_size=DEFAULT_PAGE_SIZE)
+
+@app.route('/api/items')
+@login_required
+def api_items():
+    status = request.args.get('status') or None
+    if status is not None and status not in STATUSES:
+        return jsonify({'error': f'Unknown status: {status}'}), 400
+    try:
+        page = inventory_page(
+            session['user_id'],
+            forecast_surplus(),
+            category=request.args.get('category') or None,
+            location=request.args.get('location') or None,
+            status=status,
+            q=request.args.get('q') or None,
+            cursor=request.args.get('cursor') or None,
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(page)
 
 @app.route('/add_item', methods=['POST'])
 def add_item():
@@ -118,59 +229,71 @@ def add_item():
     location = request.form['location']
     added_date = datetime.now()
     expiry_date = added_date + timedelta(days=shelf_life)
-    item = Item(name=name, category=category, quantity=quantity, shelf_life=shelf_life, location=location, added_date=added_date, expiry_date=expiry_date, user_id=session['user_id'])
+    item = Item(name=name, category=category, quantity=quantity, shelf_life=shelf_life, location=location, added_date=added_date, expiry_date=expiry_date, expiry_status=expiry_status(expiry_date, added_date), user_id=session['user_id'])
     db.session.add(item)
+    record_rollup_added(session['user_id'], [(category, quantity, expiry_date)])
+    bump_inventory_version(session['user_id'])
     db.session.commit()
+    invalidate_snapshot()
+    surplus_engine.item_added(session['user_id'], name, quantity, added_date)
+    if events.has_subscribers(session['user_id']):
+        events.publish(session['user_id'], ITEM_ADDED, {'item': serialize_item(item, item_status(item, forecast_surplus()))})
     return redirect(url_for('inventory'))
 
+def compute_recommendations(user_id):
+    soon_expiring, surplus = get_soon_expiring(10), forecast_surplus()
+    with metrics.stage('waste_forecast'):
+        at_risk = at_risk_items(user_id)
+    with metrics.stage('recommend'):
+        recs, _ = build_recommendations(user_id, soon_expiring, surplus, at_risk=at_risk)
+    return recs
+
 @app.route('/recommendations')
 @login_required
+@view_cache.conditional('recommendations')
 def recommendations():
-    surplus = forecast_surplus()
-    expiry_pq = get_expiry_queue()
-    soon_expiring = [heapq.heappop(expiry_pq)[1] for _ in range(min(10, len(expiry_pq)))]
-    recs = []
-    for item in soon_expiring:
-        recs.append({'item': item, 'action': 'Donate'})
-    for name in surplus:
-        item = Item.query.filter_by(name=name, user_id=session['user_id']).first()
-        if item:
-            if item.category in ['Canned', 'Beverages', 'Frozen']:
-                recs.append({'item': item, 'action': 'Recycle'})
-            else:
-                recs.append({'item': item, 'action': 'Repurpose'})
-    return render_template('recommendations.html', recs=recs, now=datetime.now(), timedelta=timedelta)
+    user_id = session['user_id']
+    recs = view_cache.cached(user_id, 'recommendations', lambda: compute_recommendations(user_id))
+    fragments = {
+        'recommendation_rows': view_cache.fragment(user_id, 'recommendation_rows', '_recommendation_rows.html',
+                                                   lambda: {'recs': recs}),
+    }
+    return render_template('recommendations.html', recs=recs, fragments=fragments, now=datetime.now(), timedelta=timedelta)
 
-@app.route('/analytics')
+@app.route('/recommendations/rows')
 @login_required
-def analytics():
-    items = Item.query.filter_by(user_id=session['user_id']).all()
-    category_map = get_category_map()
+def recommendation_rows():
+    # Refetched by the recommendations page when /events reports a change
+    user_id = session['user_id']
+    recs = view_cache.cached(user_id, 'recommendations', lambda: compute_recommendations(user_id))
+    html = view_cache.fragment(user_id, 'recommendation_rows', '_recommendation_rows.html', lambda: {'recs': recs})
+    actions = [rec['action'] for rec in recs]
+    return jsonify({
+        'html': str(html),
+        'counts': {'total': len(recs), 'donate': actions.count('Donate'), 'repurpose': actions.count('Repurpose')},
+    })
+
+def compute_analytics(user_id):
+    # Per-category totals come from the rollup table, so this is O(categories)
+    with metrics.stage('rollups'):
+        rollups = get_rollups(user_id)
     
     # Calculate analytics
-    total_items = len(items)
-    total_quantity = sum(item.quantity for item in items)
-    categories = list(category_map.keys())
-    category_counts = {cat: len(category_map[cat]) for cat in categories}
+    total_items = sum(r.item_count for r in rollups)
+    total_quantity = sum(r.total_quantity for r in rollups)
+    categories = [r.category for r in rollups]
+    category_counts = {r.category: r.item_count for r in rollups}
+    category_expiring = {r.category: r.expiring_count for r in rollups}
     
     # Waste reduction metrics
     surplus = forecast_surplus()
-    expiry_pq = get_expiry_queue()
-    soon_expiring = [heapq.heappop(expiry_pq)[1] for _ in range(min(10, len(expiry_pq)))]
+    soon_expiring = get_soon_expiring(10)
     
     # Recommendation breakdown
-    donate_count = 0
-    repurpose_count = 0
-    recycle_count = 0
-    for item in soon_expiring:
-        donate_count += 1
-    for name in surplus:
-        item = Item.query.filter_by(name=name, user_id=session['user_id']).first()
-        if item:
-            if item.category in ['Canned', 'Beverages', 'Frozen']:
-                recycle_count += 1
-            else:
-                repurpose_count += 1
+    with metrics.stage('waste_forecast'):
+        at_risk = at_risk_items(user_id)
+    with metrics.stage('recommend'):
+        _, rec_counts = build_recommendations(user_id, soon_expiring, surplus, at_risk=at_risk)
     
     waste_reduction = {
         'total_items': total_items,
@@ -178,49 +301,192 @@ def analytics():
         'expiring_soon': len(soon_expiring),
         'categories': categories,
         'category_counts': category_counts,
+        'category_expiring': category_expiring,
         'total_quantity': total_quantity,
-        'donate_count': donate_count,
-        'repurpose_count': repurpose_count,
-        'recycle_count': recycle_count
+        **rec_counts
     }
-    
-    return render_template('analytics.html', analytics=waste_reduction, items=items, now=datetime.now(), timedelta=timedelta)
+    return waste_reduction
+
+@app.route('/analytics')
+@login_required
+@view_cache.conditional('analytics')
+def analytics():
+    user_id = session['user_id']
+    waste_reduction = view_cache.cached(user_id, 'analytics', lambda: compute_analytics(user_id))
+    fragments = {
+        'category_table_rows': view_cache.fragment(user_id, 'category_table_rows', '_category_table_rows.html',
+                                                   lambda: {'analytics': waste_reduction}),
+    }
+    return render_template('analytics.html', analytics=waste_reduction, fragments=fragments, now=datetime.now(), timedelta=timedelta)
+
+# Write routes publish what changed to the user's open /events streams (see events.py)
+def publish_removed(user_id, removed):
+    if removed is None:
+        events.publish(user_id, CHANGED)
+    else:
+        events.publish(user_id, ITEMS_REMOVED, {'ids': [row.id for row in removed]})
 
 @app.route('/delete_item/<int:item_id>')
 def delete_item(item_id):
-    item = Item.query.filter_by(id=item_id, user_id=session.get('user_id')).first()
-    if item:
-        db.session.delete(item)
-        db.session.commit()
+    user_id = session.get('user_id')
+    deleted, removed = delete_items(user_id, ids=[item_id])
+    if deleted:
+        invalidate_snapshot()
+        surplus_engine.items_removed(user_id, removed)
+        publish_removed(user_id, removed)
     return redirect(url_for('inventory'))
 
 @app.route('/update_quantity/<int:item_id>', methods=['POST'])
 def update_quantity(item_id):
-    item = Item.query.filter_by(id=item_id, user_id=session.get('user_id')).first()
-    if item:
-        new_quantity = int(request.form['quantity'])
-        item.quantity = new_quantity
-        db.session.commit()
+    user_id = session.get('user_id')
+    quantity = int(request.form['quantity'])
+    updated, changes = update_quantities(user_id, quantity=quantity, ids=[item_id])
+    if updated:
+        invalidate_snapshot()
+        surplus_engine.quantities_changed(user_id, changes)
+        events.publish(user_id, ITEMS_UPDATED, {'ids': [item_id], 'quantity': max(quantity, 0), 'delta': None})
     return redirect(url_for('inventory'))
 
 @app.route('/mark_complete/<int:item_id>', methods=['POST'])
 def mark_complete(item_id):
-    item = Item.query.filter_by(id=item_id, user_id=session.get('user_id')).first()
-    if item:
-        db.session.delete(item)
-        db.session.commit()
+    user_id = session.get('user_id')
+    deleted, removed = delete_items(user_id, ids=[item_id])
+    if deleted:
+        invalidate_snapshot()
+        surplus_engine.items_removed(user_id, removed)
+        publish_removed(user_id, removed)
     return jsonify({'success': True})
 
 @app.route('/delete_selected', methods=['POST'])
 def delete_selected():
-    item_ids = request.form.getlist('item_ids')
-    for item_id in item_ids:
-        item = Item.query.filter_by(id=item_id, user_id=session.get('user_id')).first()
-        if item:
-            db.session.delete(item)
-    db.session.commit()
+    user_id = session.get('user_id')
+    try:
+        item_ids = parse_ids(request.form.getlist('item_ids'))
+    except ValueError:
+        item_ids = []
+    if item_ids:
+        deleted, removed = delete_items(user_id, ids=item_ids)
+        if deleted:
+            invalidate_snapshot()
+            surplus_engine.items_removed(user_id, removed)
+            publish_removed(user_id, removed)
     return redirect(url_for('inventory'))
 
+# --- Bulk mutation API ---
+# Body: {"ids": [...]} and/or {"category", "location", "expired": true}
+def _bulk_selection(payload):
+    selection = {
+        'category': payload.get('category') or None,
+        'location': payload.get('location') or None,
+        'expired': bool(payload.get('expired')),
+    }
+    if payload.get('ids') is not None:
+        selection['ids'] = parse_ids(payload['ids'])
+    return selection
+
+@app.route('/api/items/delete', methods=['POST'])
+@login_required
+def api_delete_items():
+    payload = request.get_json(silent=True) or {}
+    user_id = session['user_id']
+    try:
+        deleted, removed = delete_items(user_id, **_bulk_selection(payload))
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    if deleted:
+        invalidate_snapshot()
+        surplus_engine.items_removed(user_id, removed)
+        publish_removed(user_id, removed)
+    return jsonify({'deleted': deleted})
+
+@app.route('/api/items/quantity', methods=['POST'])
+@login_required
+def api_update_quantities():
+    payload = request.get_json(silent=True) or {}
+    user_id = session['user_id']
+    try:
+        selection = _bulk_selection(payload)
+        updated, changes = update_quantities(user_id, quantity=payload.get('quantity'), delta=payload.get('delta'),
+                                             **selection)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    if updated:
+        invalidate_snapshot()
+        surplus_engine.quantities_changed(user_id, changes)
+        if 'ids' in selection and not (selection['category'] or selection['location'] or selection['expired']):
+            quantity = payload.get('quantity')
+            events.publish(user_id, ITEMS_UPDATED, {
+                'ids': selection['ids'],
+                'quantity': max(int(quantity), 0) if quantity is not None else None,
+                'delta': int(payload['delta']) if quantity is None else None,
+            })
+        else:
+            # Filtered updates do not report which rows they touched
+            events.publish(user_id, CHANGED)
+    return jsonify({'updated': updated})
+
+@app.route('/import', methods=['POST'])
+@login_required
+def import_inventory():
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    batch_size = request.form.get('batch_size', DEFAULT_BATCH_SIZE, type=int)
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    summary = import_stream(stream, fmt, session['user_id'], max(1, batch_size))
+    invalidate_snapshot()
+    surplus_engine.invalidate(session['user_id'])
+    events.publish(session['user_id'], CHANGED)
+    return jsonify(summary)
+
+@app.route('/export')
+@login_required
+def export_inventory():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    chunks = export_items(session['user_id'], fmt)
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=inventory.{fmt}'})
+
+@app.route('/events')
+@login_required
+def event_stream():
+    if not app.config['EVENTS_ENABLED']:
+        return '', 204  # tells EventSource not to reconnect
+    return Response(stream_with_context(events.stream(session['user_id'])), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Create missing tables, columns and indexes (safe to run on every deploy)."""
+    applied = database.migrate()
+    print('Applied: ' + ', '.join(applied) if applied else 'Schema is up to date.')
+
+@app.cli.command('forecast-waste')
+def forecast_waste_command():
+    """Refit consumption rates and refresh waste predictions once."""
+    forecaster.processes = 0
+    at_risk = forecaster()
+    print(f'{at_risk} items are predicted to go unused before they expire.')
+
+@app.cli.command('reconcile-rollups')
+def reconcile_rollups_command():
+    """Rebuild every user's category rollup (run periodically, e.g. from cron)."""
+    reconcile_rollups()
+    print('Category rollups rebuilt.')
+
+@app.cli.command('sweep-expiry')
+def sweep_expiry_command():
+    """Advance item expiry states once (for deployments with the scheduler disabled)."""
+    events = sweep_expiry()
+    print(f'{len(events)} items changed expiry state.')
+
 if __name__ == '__main__':
+    start_background_jobs()
     port = int(os.environ.get('PORT', 5051))
     app.run(host='0.0.0.0', port=port, debug=False) 
\ No newline at end of file
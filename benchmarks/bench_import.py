@@ -0,0 +1,80 @@
+"""Bulk import/export throughput (rows/sec) for CSV and JSONL manifests.
+
+Usage: python benchmarks/bench_import.py [--rows 100000] [--batch-size 1000]
+
+Runs against a throwaway SQLite file so it never touches waste_tracker.db.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix='swt-bench-'), 'bench.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_FILE
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from bulk import import_stream, export_items, IMPORT_FIELDS  # noqa: E402
+from models import db, User  # noqa: E402
+
+NAMES = ['Milk', 'Bread', 'Eggs', 'Apple', 'Chicken', 'Rice', 'Spinach', 'Yogurt']
+CATEGORIES = ['Dairy', 'Bakery', 'Produce', 'Meat', 'Frozen', 'Canned', 'Beverages', 'Snacks']
+LOCATIONS = ['Fridge', 'Freezer', 'Pantry']
+
+
+def manifest_rows(n_rows):
+    rng = random.Random(42)
+    for _ in range(n_rows):
+        yield {
+            'name': f'{rng.choice(NAMES)} {rng.randint(1, 500)}',
+            'category': rng.choice(CATEGORIES),
+            'quantity': rng.randint(1, 25),
+            'shelf_life': rng.randint(1, 365),
+            'location': rng.choice(LOCATIONS),
+        }
+
+
+def build_manifest(fmt, n_rows):
+    if fmt == 'jsonl':
+        return ''.join(json.dumps(row) + '\n' for row in manifest_rows(n_rows))
+    lines = [','.join(IMPORT_FIELDS)]
+    lines += [','.join(str(row[field]) for field in IMPORT_FIELDS) for row in manifest_rows(n_rows)]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f'{args.rows} rows, batch size {args.batch_size}')
+        print(f'{"format":<8}{"import rows/s":>16}{"export rows/s":>16}')
+        for fmt in ('csv', 'jsonl'):
+            user = User(username=f'bench-{fmt}', email=f'bench-{fmt}@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+            manifest = build_manifest(fmt, args.rows)
+
+            start = time.perf_counter()
+            summary = import_stream(io.StringIO(manifest, newline=''), fmt, user.id, args.batch_size)
+            import_rate = summary['imported'] / (time.perf_counter() - start)
+            assert summary['imported'] == args.rows, summary
+
+            start = time.perf_counter()
+            exported = sum(chunk.count('\n') for chunk in export_items(user.id, fmt, args.batch_size))
+            export_rate = args.rows / (time.perf_counter() - start)
+            assert exported >= args.rows, exported
+            print(f'{fmt:<8}{import_rate:>16,.0f}{export_rate:>16,.0f}')
+
+
+if __name__ == '__main__':
+    main()
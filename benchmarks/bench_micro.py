@@ -0,0 +1,84 @@
+"""Micro-benchmarks for the per-request data structures in app.py.
+
+Usage: python benchmarks/bench_micro.py [--users 4] [--items 20000] [--repeat 20] [--json out.json]
+
+Each function is timed cold (its cache or the request snapshot discarded
+first, so the database load is included) and warm (served from the surplus
+engine or an already-loaded snapshot).
+"""
+import argparse
+
+import common
+from flask import session
+from app import app, surplus_engine, forecast_surplus, get_expiry_queue, get_category_map, get_soon_expiring
+from generate import populate
+from models import db
+from snapshot import get_snapshot
+
+
+def request_context(user_id):
+    """A fresh request (and so an empty ``g``) logged in as ``user_id``."""
+    ctx = app.test_request_context()
+    ctx.push()
+    session['user_id'] = user_id
+    return ctx
+
+
+def bench(user_id, repeat):
+    def cold(func):
+        def setup():
+            ctx = request_context(user_id)
+            surplus_engine.invalidate(user_id)
+            return ctx
+
+        def run(ctx):
+            try:
+                func()
+            finally:
+                ctx.pop()
+        return common.measure(run, repeat, setup)
+
+    def warm(func):
+        ctx = request_context(user_id)
+        try:
+            forecast_surplus()
+            snapshot = get_snapshot()
+            return common.measure(lambda: func(snapshot), repeat)
+        finally:
+            ctx.pop()
+
+    return {
+        'forecast_surplus': {'cold': cold(forecast_surplus), 'warm': warm(lambda _: forecast_surplus())},
+        'get_expiry_queue': {'cold': cold(get_expiry_queue), 'warm': warm(get_expiry_queue)},
+        'get_category_map': {'cold': cold(get_category_map), 'warm': warm(get_category_map)},
+        'get_soon_expiring': {'cold': cold(lambda: get_soon_expiring(10)), 'warm': warm(lambda _: get_soon_expiring(10))},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--items', type=int, default=20000, help='items per user')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user_ids = populate(args.users, args.items, args.seed)
+
+    # Every user gets the same distribution, so timing one is representative
+    results = bench(user_ids[0], args.repeat)
+    print(f'{args.users} users x {args.items} items, {args.repeat} runs')
+    print(f'{"function":<20}{"cold best":>12}{"cold median":>14}{"warm best":>12}{"warm median":>14}')
+    for name, timings in results.items():
+        cold, warm = timings['cold'], timings['warm']
+        print(f'{name:<20}{cold["best_ms"]:>12.2f}{cold["median_ms"]:>14.2f}{warm["best_ms"]:>12.2f}{warm["median_ms"]:>14.2f}')
+    if args.json:
+        common.write_json(args.json, 'micro', {k: v for k, v in vars(args).items() if k != 'json'}, results)
+
+
+if __name__ == '__main__':
+    main()
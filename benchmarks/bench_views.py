@@ -0,0 +1,128 @@
+"""End-to-end query count and latency for every route, via the Flask test client.
+
+Usage: python benchmarks/bench_views.py [--users 1] [--items 20000] [--repeat 5] [--cache] [--json out.json]
+
+Seeds synthetic inventories (see generate.py) into a throwaway database and
+times each route as the first generated user. Write routes run after the
+read routes and each repetition targets a different item.
+"""
+import argparse
+import io
+import statistics
+import time
+
+import common
+from sqlalchemy import event
+from app import app, view_cache, metrics, events
+from generate import populate, PASSWORD
+from models import db, Item
+
+IMPORT_MANIFEST = 'name,category,quantity,shelf_life,location\n' + 'Milk,Dairy,2,7,Fridge\n' * 100
+
+
+def build_routes(item_ids, next_cursor):
+    """``(label, factory)`` pairs; each call of ``factory`` returns ``(method, path, request_kwargs)``."""
+    ids = iter(item_ids)
+    signups = iter(range(10 ** 9))
+
+    def signup(n):
+        return 'POST', '/signup', {'data': {'username': f'signup-{n}', 'email': f'signup-{n}@example.com', 'password': 'x'}}
+
+    return [
+        ('GET /signup', lambda: ('GET', '/signup', {})),
+        ('GET /login', lambda: ('GET', '/login', {})),
+        ('POST /login', lambda: ('POST', '/login', {'data': {'username': 'bench-0', 'password': PASSWORD}})),
+        ('GET /', lambda: ('GET', '/', {})),
+        ('GET /inventory', lambda: ('GET', '/inventory', {})),
+        ('GET /api/items', lambda: ('GET', '/api/items', {})),
+        ('GET /api/items page 2', lambda: ('GET', f'/api/items?cursor={next_cursor}', {})),
+        ('GET /api/items?status=expiring', lambda: ('GET', '/api/items?status=expiring', {})),
+        ('GET /api/items?q=milk', lambda: ('GET', '/api/items?q=milk', {})),
+        ('GET /recommendations', lambda: ('GET', '/recommendations', {})),
+        ('GET /recommendations/rows', lambda: ('GET', '/recommendations/rows', {})),
+        ('GET /dashboard/fragments', lambda: ('GET', '/dashboard/fragments', {})),
+        ('GET /events', lambda: ('GET', '/events', {})),
+        ('GET /analytics', lambda: ('GET', '/analytics', {})),
+        ('GET /export?format=csv', lambda: ('GET', '/export?format=csv', {})),
+        ('GET /export?format=jsonl', lambda: ('GET', '/export?format=jsonl', {})),
+        ('GET /metrics', lambda: ('GET', '/metrics', {})),
+        # Writes
+        ('POST /signup', lambda: signup(next(signups))),
+        ('POST /add_item', lambda: ('POST', '/add_item', {'data': {
+            'name': 'Milk', 'category': 'Dairy', 'quantity': '2', 'shelf_life': '7', 'location': 'Fridge'}})),
+        ('POST /update_quantity', lambda: ('POST', f'/update_quantity/{next(ids)}', {'data': {'quantity': '3'}})),
+        ('POST /api/items/quantity', lambda: ('POST', '/api/items/quantity', {'json': {'ids': [next(ids)], 'delta': 1}})),
+        ('POST /mark_complete', lambda: ('POST', f'/mark_complete/{next(ids)}', {})),
+        ('GET /delete_item', lambda: ('GET', f'/delete_item/{next(ids)}', {})),
+        ('POST /delete_selected', lambda: ('POST', '/delete_selected', {'data': {'item_ids': [str(next(ids))]}})),
+        ('POST /api/items/delete', lambda: ('POST', '/api/items/delete', {'json': {'ids': [next(ids)]}})),
+        ('POST /import', lambda: ('POST', '/import', {'data': {'file': (io.BytesIO(IMPORT_MANIFEST.encode()), 'bench.csv')},
+                                                      'content_type': 'multipart/form-data'})),
+        ('GET /logout', lambda: ('GET', '/logout', {})),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--items', type=int, default=20000, help='items per user')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache', action='store_true', help='measure with the view cache enabled')
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    args = parser.parse_args()
+    view_cache.enabled = args.cache
+    events.stream_seconds = 0  # time the /events handshake, not an open stream
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user_id = populate(args.users, args.items, args.seed)[0]
+        item_ids = db.session.execute(
+            db.select(Item.id).where(Item.user_id == user_id).order_by(Item.id).limit(args.repeat * 10)
+        ).scalars().all()
+        queries = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: queries.append(1))
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    next_cursor = client.get('/api/items').get_json()['next_cursor']
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+
+    print(f'{args.users} users x {args.items} items, best of {args.repeat}, view cache {"on" if args.cache else "off"}')
+    print(f'{"route":<32}{"status":>7}{"queries":>8}{"best ms":>10}{"median ms":>11}')
+    results = {}
+    for label, make_request in build_routes(item_ids, next_cursor):
+        if label == 'GET /metrics' and not metrics.enabled:
+            continue
+        samples = []
+        for _ in range(args.repeat):
+            method, path, kwargs = make_request()
+            with client.session_transaction() as sess:
+                sess['user_id'] = user_id
+            queries.clear()
+            start = time.perf_counter()
+            response = client.open(path, method=method, **kwargs)
+            response.get_data()  # drain streamed bodies inside the timing
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code < 400, (label, response.status_code)
+        covered.add(adapter.match(path.split('?')[0], method)[0])
+        results[label] = {
+            'status': response.status_code,
+            'queries': len(queries),
+            'best_ms': round(min(samples), 3),
+            'median_ms': round(statistics.median(samples), 3),
+        }
+        print(f'{label:<32}{response.status_code:>7}{len(queries):>8}{min(samples):>10.1f}{statistics.median(samples):>11.1f}')
+
+    missing = {rule.endpoint for rule in app.url_map.iter_rules()} - covered - {'static'}
+    if missing:
+        print('Routes not exercised:', ', '.join(sorted(missing)))
+    if args.json:
+        common.write_json(args.json, 'views', {k: v for k, v in vars(args).items() if k != 'json'}, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Shared setup and reporting for the benchmark scripts.
+
+Import this before ``app``: it points DATABASE_URL at a throwaway SQLite file
+(unless BENCH_DATABASE_URL is set) so benchmarks never touch waste_tracker.db.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix='swt-bench-'), 'bench.db')
+os.environ['DATABASE_URL'] = os.environ.get('BENCH_DATABASE_URL') or 'sqlite:///' + DB_FILE
+os.environ.setdefault('SCHEDULER_ENABLED', '0')
+sys.path.insert(0, ROOT)
+
+
+def measure(func, repeat, setup=None):
+    """Call ``func`` ``repeat`` times and summarize the wall time in milliseconds.
+
+    ``setup`` runs untimed before each call and its result is passed to ``func``.
+    """
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        func(arg) if setup is not None else func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'best_ms': round(min(samples), 3),
+        'median_ms': round(statistics.median(samples), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'repeat': repeat,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(path, benchmark, params, results):
+    """Write a run as JSON so two runs can be diffed (see benchmarks/compare.py)."""
+    document = {
+        'benchmark': benchmark,
+        'params': params,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'database': os.environ['DATABASE_URL'].split(':', 1)[0],
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+    }
+    with open(path, 'w') as fh:
+        json.dump(document, fh, indent=2)
+        fh.write('\n')
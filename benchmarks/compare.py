@@ -0,0 +1,66 @@
+"""Compare two benchmark JSON files and flag regressions.
+
+Usage: python benchmarks/compare.py before.json after.json [--threshold 1.2] [--metric best_ms]
+
+Exits with status 1 if any timing in ``after`` is slower than ``before`` by
+more than ``threshold`` (a ratio), or if any query count went up.
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(results, prefix=''):
+    """``{'a': {'cold': {'best_ms': 1}}}`` -> ``{'a cold': {'best_ms': 1}}``"""
+    flat = {}
+    for key, value in results.items():
+        name = f'{prefix} {key}'.strip()
+        if isinstance(value, dict) and not any(isinstance(v, (int, float)) for v in value.values()):
+            flat.update(flatten(value, name))
+        else:
+            flat[name] = value
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    parser.add_argument('--metric', default='best_ms')
+    args = parser.parse_args()
+
+    with open(args.before) as fh:
+        before = json.load(fh)
+    with open(args.after) as fh:
+        after = json.load(fh)
+    if before['benchmark'] != after['benchmark']:
+        sys.exit(f'Cannot compare {before["benchmark"]} with {after["benchmark"]} results')
+    if before['params'] != after['params']:
+        print('Warning: runs used different parameters')
+
+    old, new = flatten(before['results']), flatten(after['results'])
+    print(f'{before["revision"]} -> {after["revision"]}  ({args.metric})')
+    print(f'{"name":<40}{"before":>10}{"after":>10}{"ratio":>8}')
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        a, b = old[name].get(args.metric), new[name].get(args.metric)
+        if a is None or b is None:
+            continue
+        ratio = b / a if a else float('inf') if b else 1.0
+        flag = ''
+        if ratio > args.threshold:
+            flag = '  slower'
+            regressions.append(name)
+        if new[name].get('queries', 0) > old[name].get('queries', 0):
+            flag += '  +queries'
+            regressions.append(name)
+        print(f'{name:<40}{a:>10.2f}{b:>10.2f}{ratio:>8.2f}{flag}')
+    for name in sorted(old.keys() ^ new.keys()):
+        print(f'{name:<40}  only in {"before" if name in old else "after"}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
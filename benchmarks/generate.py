@@ -0,0 +1,106 @@
+"""Synthetic inventory generator: N users x M items from the init_db.py vocabulary.
+
+Usage: python benchmarks/generate.py --users 4 --items 100000 [--history-days 90] [--reset]
+
+Writes to DATABASE_URL (or the app's default database). Item names, categories,
+locations and typical shelf lives come from init_db.SAMPLE_ITEMS_PER_USER;
+names get brand variants, and shelf lives, quantities and added dates are
+jittered so each inventory has a realistic mix of fresh, expiring and
+expired items rather than one expiry date per name.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from app import app  # noqa: E402
+from bulk import import_items, DEFAULT_BATCH_SIZE  # noqa: E402
+from init_db import SAMPLE_ITEMS_PER_USER  # noqa: E402
+from models import db, User  # noqa: E402
+
+BRANDS = ['Acme', 'Farmhouse', 'Green Valley', 'Harvest', 'Northfield', 'Sunrise', 'Value']
+PASSWORD = 'bench'
+
+
+def vocabulary():
+    """One template per distinct item name in the sample data."""
+    templates = {}
+    for items in SAMPLE_ITEMS_PER_USER:
+        for item in items:
+            templates.setdefault(item['name'], item)
+    return list(templates.values())
+
+
+def generate_items(rng, n_items, now=None, history_days=90):
+    """Yield ``n_items`` item dicts in the shape ``bulk.import_items`` accepts.
+
+    Added dates are skewed towards the recent past (most of a pantry was
+    bought lately, a long tail was not), and shelf lives vary around the
+    template's value, so short-lived items added weeks ago come out expired.
+    """
+    now = now or datetime.now()
+    templates = vocabulary()
+    for _ in range(n_items):
+        template = rng.choice(templates)
+        name = template['name'] if rng.random() < 0.5 else f'{rng.choice(BRANDS)} {template["name"]}'
+        age = min(rng.expovariate(6 / history_days), history_days)
+        yield {
+            'name': name,
+            'category': template['category'],
+            'quantity': max(1, round(template['quantity'] * rng.uniform(0.5, 2.0))),
+            'shelf_life': max(1, round(template['shelf_life'] * rng.lognormvariate(0, 0.25))),
+            'location': template['location'],
+            'added_date': now - timedelta(days=age),
+        }
+
+
+def populate(n_users, n_items, seed=42, history_days=90, batch_size=DEFAULT_BATCH_SIZE, prefix='bench'):
+    """Create ``n_users`` users with ``n_items`` items each; returns their ids.
+
+    Deterministic for a given ``seed``. Call inside an app context.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    # Hashing once keeps user creation cheap at large N
+    password_hash = generate_password_hash(PASSWORD)
+    users = [User(username=f'{prefix}-{i}', email=f'{prefix}-{i}@example.com', password_hash=password_hash)
+             for i in range(n_users)]
+    db.session.add_all(users)
+    db.session.commit()
+    user_ids = [user.id for user in users]
+    for user_id in user_ids:
+        summary = import_items(enumerate(generate_items(rng, n_items, now, history_days), start=1), user_id, batch_size)
+        assert not summary['failed'], summary['errors']
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--items', type=int, default=10000, help='items per user')
+    parser.add_argument('--history-days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='bench', help='username prefix (must not already exist)')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        user_ids = populate(args.users, args.items, args.seed, args.history_days, prefix=args.prefix)
+        elapsed = time.perf_counter() - start
+    total = args.users * args.items
+    print(f'{len(user_ids)} users x {args.items} items ({total} rows) in {elapsed:.1f}s; '
+          f'log in as {args.prefix}-0 / {PASSWORD}')
+
+
+if __name__ == '__main__':
+    main()
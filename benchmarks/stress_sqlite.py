@@ -0,0 +1,133 @@
+"""Concurrent read/write stress test against a local SQLite file.
+
+Usage: python benchmarks/stress_sqlite.py [--workers 4] [--seconds 20] [--write-ratio 0.2] [--journal-mode WAL]
+
+Starts ``--workers`` processes (standing in for gunicorn workers), each
+driving the app through the test client with a mix of page reads and item
+writes for random users. Reports throughput, latency percentiles and every
+error, including "database is locked". Compare ``--journal-mode DELETE``
+with the default WAL to see the effect of the connect-time PRAGMAs.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+
+import common
+
+READS = ['/', '/inventory', '/api/items', '/api/items?status=expiring', '/recommendations', '/analytics']
+
+
+def worker(index, user_ids, seconds, write_ratio, queue):
+    from flask import got_request_exception
+    from app import app, view_cache
+    view_cache.enabled = False  # measure the database, not the cache
+    errors = Counter()
+
+    def record_exception(sender, exception, **extra):
+        errors[f'{type(exception).__name__}: {str(exception).splitlines()[0][:80]}'] += 1
+    got_request_exception.connect(record_exception, app)
+
+    rng = random.Random(index)
+    client = app.test_client()
+    latencies = defaultdict(list)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        user_id = rng.choice(user_ids)
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        if rng.random() < write_ratio:
+            op = rng.choice(['add', 'quantity', 'delete'])
+            if op == 'add':
+                request = ('POST', '/add_item', {'data': {'name': 'Milk', 'category': 'Dairy', 'quantity': '2',
+                                                          'shelf_life': '7', 'location': 'Fridge'}})
+            elif op == 'quantity':
+                request = ('POST', '/api/items/quantity', {'json': {'category': 'Dairy', 'delta': 1}})
+            else:
+                request = ('POST', '/api/items/delete', {'json': {'expired': True, 'category': rng.choice(['Fruit', 'Meat'])}})
+            label = 'write ' + op
+        else:
+            path = rng.choice(READS)
+            request = ('GET', path, {})
+            label = 'read ' + path
+        method, path, kwargs = request
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()
+        latencies[label].append((time.perf_counter() - start) * 1000)
+    queue.put((dict(latencies), dict(errors)))
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--items', type=int, default=5000, help='items per user')
+    parser.add_argument('--journal-mode', default='WAL')
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    args = parser.parse_args()
+    assert os.environ['DATABASE_URL'].startswith('sqlite:'), 'stress_sqlite.py only runs against SQLite'
+
+    # Workers are separate processes; point them at this run's database file
+    os.environ['BENCH_DATABASE_URL'] = os.environ['DATABASE_URL']
+    os.environ['SQLITE_JOURNAL_MODE'] = args.journal_mode
+    from app import app
+    from generate import populate
+    from models import db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user_ids = populate(args.users, args.items)
+        db.engine.dispose()
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(i, user_ids, args.seconds, args.write_ratio, queue))
+                 for i in range(args.workers)]
+    for process in processes:
+        process.start()
+    latencies, errors = defaultdict(list), Counter()
+    for _ in processes:
+        worker_latencies, worker_errors = queue.get()
+        for label, samples in worker_latencies.items():
+            latencies[label].extend(samples)
+        errors.update(worker_errors)
+    for process in processes:
+        process.join()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f'{args.workers} workers, {args.seconds:.0f}s, write ratio {args.write_ratio}, journal {args.journal_mode}: '
+          f'{total} requests, {total / args.seconds:.0f} req/s')
+    print(f'{"operation":<36}{"count":>7}{"p50 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+    results = {}
+    for label in sorted(latencies):
+        samples = latencies[label]
+        results[label] = {
+            'count': len(samples),
+            'median_ms': round(statistics.median(samples), 3),
+            'p99_ms': round(percentile(samples, 0.99), 3),
+            'max_ms': round(max(samples), 3),
+        }
+        print(f'{label:<36}{len(samples):>7}{results[label]["median_ms"]:>9.1f}'
+              f'{results[label]["p99_ms"]:>9.1f}{results[label]["max_ms"]:>9.1f}')
+    for message, count in errors.most_common():
+        print(f'error x{count}: {message}')
+    if args.json:
+        results['errors'] = dict(errors)
+        common.write_json(args.json, 'stress_sqlite', {k: v for k, v in vars(args).items() if k != 'json'}, results)
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+from models import db, Item
+import rollup
+from expiry import expiry_status
+from cache import bump_inventory_version
+
+IMPORT_FIELDS = ('name', 'category', 'quantity', 'shelf_life', 'location')
+EXPORT_FIELDS = ('id', 'name', 'category', 'quantity', 'shelf_life', 'location', 'added_date', 'expiry_date')
+FORMATS = ('csv', 'jsonl')
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class RowError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+
+
+def detect_format(filename, default='csv'):
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+
+# --- Parsing ---
+# Readers are generators over a text stream, so a manifest is never held in
+# memory as a whole; each yields (line_number, raw_row) pairs.
+def iter_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_jsonl(stream):
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, exc
+
+
+def iter_rows(stream, fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    return iter_csv(stream) if fmt == 'csv' else iter_jsonl(stream)
+
+
+def _parse_datetime(value):
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).strip())
+    if value.tzinfo is not None:
+        # Stored dates are naive local time, as from datetime.now()
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def validate_row(line, raw, user_id, now=None):
+    """Turn one raw manifest row into insert parameters for ``Item``."""
+    if isinstance(raw, Exception):
+        raise RowError(line, f'invalid JSON ({raw})')
+    if not isinstance(raw, dict):
+        raise RowError(line, 'expected an object')
+    missing = [field for field in IMPORT_FIELDS if raw.get(field) in (None, '')]
+    if missing:
+        raise RowError(line, 'missing ' + ', '.join(missing))
+    try:
+        quantity = int(raw['quantity'])
+        shelf_life = int(raw['shelf_life'])
+    except (TypeError, ValueError):
+        raise RowError(line, 'quantity and shelf_life must be integers')
+    if quantity < 0 or shelf_life < 0:
+        raise RowError(line, 'quantity and shelf_life must not be negative')
+    added_date = raw.get('added_date')
+    try:
+        added_date = _parse_datetime(added_date) if added_date else (now or datetime.now())
+        expiry_date = added_date + timedelta(days=shelf_life)
+    except (ValueError, OverflowError):
+        raise RowError(line, f'invalid added_date {added_date!r}')
+    return {
+        'name': str(raw['name']).strip(),
+        'category': str(raw['category']).strip(),
+        'quantity': quantity,
+        'shelf_life': shelf_life,
+        'location': str(raw['location']).strip(),
+        'added_date': added_date,
+        'expiry_date': expiry_date,
+        'expiry_status': expiry_status(expiry_date, now),
+        'user_id': user_id,
+    }
+
+
+# --- Import ---
+def import_items(rows, user_id, batch_size=DEFAULT_BATCH_SIZE):
+    """Validate ``(line, raw)`` pairs and insert them in batches.
+
+    Each batch is written with a single executemany ``INSERT`` and committed on
+    its own, so a long import holds no more than ``batch_size`` rows in memory.
+    Invalid rows are skipped and reported; they do not abort the import.
+    """
+    now = datetime.now()
+    summary = {'imported': 0, 'failed': 0, 'batches': 0, 'errors': []}
+
+    def valid_rows():
+        for line, raw in rows:
+            try:
+                yield validate_row(line, raw, user_id, now)
+            except RowError as exc:
+                summary['failed'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append(str(exc))
+
+    valid = valid_rows()
+    while True:
+        batch = list(islice(valid, batch_size))
+        if not batch:
+            break
+        db.session.execute(db.insert(Item), batch)
+        rollup.record_added(user_id, ((row['category'], row['quantity'], row['expiry_date']) for row in batch), now)
+        bump_inventory_version(user_id)
+        db.session.commit()
+        summary['imported'] += len(batch)
+        summary['batches'] += 1
+    return summary
+
+
+def import_stream(stream, fmt, user_id, batch_size=DEFAULT_BATCH_SIZE):
+    return import_items(iter_rows(stream, fmt), user_id, batch_size)
+
+
+# --- Export ---
+def iter_export_rows(user_id, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield a user's items without materialising the full result set.
+
+    ``yield_per`` turns on server-side cursors where the driver supports them
+    (psycopg2) and fetches in ``batch_size`` chunks everywhere else.
+    """
+    columns = [getattr(Item, field) for field in EXPORT_FIELDS]
+    statement = (
+        db.select(*columns)
+        .where(Item.user_id == user_id)
+        .order_by(Item.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from db.session.execute(statement)
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_csv(rows, batch_size=DEFAULT_BATCH_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_export_value(value) for value in row])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_jsonl(rows, batch_size=DEFAULT_BATCH_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({field: _export_value(value) for field, value in zip(EXPORT_FIELDS, row)}))
+        if len(chunk) == batch_size:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def export_items(user_id, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    rows = iter_export_rows(user_id, batch_size)
+    return export_csv(rows, batch_size) if fmt == 'csv' else export_jsonl(rows, batch_size)
+
+
+# --- Mutations ---
+# Set-based delete/update: one statement per chunk of ids (or one statement
+# for a filter), never one SELECT plus one DELETE per item.
+MUTATION_CHUNK_SIZE = 10000
+
+
+class EmptySelection(ValueError):
+    pass
+
+
+def parse_ids(values):
+    try:
+        return sorted({int(value) for value in values})
+    except (TypeError, ValueError):
+        raise ValueError('item ids must be integers')
+
+
+def _selections(user_id, ids=None, category=None, location=None, expired=False, now=None):
+    """Yield WHERE clauses, one list per statement, scoped to ``user_id``."""
+    clauses = [Item.user_id == user_id]
+    if category:
+        clauses.append(Item.category == category)
+    if location:
+        clauses.append(Item.location == location)
+    if expired:
+        clauses.append(Item.expiry_date < (now or datetime.now()))
+    if ids is None:
+        if len(clauses) == 1:
+            # Refuse to touch a user's whole inventory by accident
+            raise EmptySelection('select items by id, category, location or expired')
+        yield clauses
+        return
+    for start in range(0, len(ids), MUTATION_CHUNK_SIZE):
+        yield clauses + [Item.id.in_(ids[start:start + MUTATION_CHUNK_SIZE])]
+
+
+def _supports(feature):
+    return getattr(db.engine.dialect, feature, False)
+
+
+def delete_items(user_id, **selection):
+    """Delete the selected items; returns ``(deleted, removed)``.
+
+    ``removed`` holds the deleted rows (id, name, category, quantity,
+    added_date, expiry_date) when the database supports
+    ``DELETE ... RETURNING``, and is ``None`` otherwise. The category
+    rollup is updated in the same transaction.
+    """
+    returning = _supports('delete_returning')
+    deleted = 0
+    removed = [] if returning else None
+    for clauses in _selections(user_id, **selection):
+        statement = db.delete(Item).where(*clauses).execution_options(synchronize_session=False)
+        if returning:
+            rows = db.session.execute(statement.returning(
+                Item.id, Item.name, Item.category, Item.quantity, Item.added_date, Item.expiry_date)).all()
+            removed.extend(rows)
+            deleted += len(rows)
+        else:
+            deleted += db.session.execute(statement).rowcount
+    if removed is not None:
+        rollup.record_removed(user_id, ((row.category, row.quantity, row.expiry_date) for row in removed))
+    elif deleted:
+        rollup.rebuild_rollups(user_id)
+    if deleted:
+        bump_inventory_version(user_id)
+    db.session.commit()
+    return deleted, removed
+
+
+def update_quantities(user_id, quantity=None, delta=None, **selection):
+    """Set (``quantity``) or shift (``delta``) the quantity of the selected items.
+
+    Shifted quantities are clamped at zero. Returns ``(updated, changes)``.
+    When items are selected by id, their quantities are read just before the
+    update: ``changes`` holds ``(name, added_date, old_quantity,
+    new_quantity)`` for each row and the category rollup is adjusted by the
+    difference. Filter-based updates rebuild the user's rollup instead, and
+    ``changes`` is ``None``.
+    """
+    if (quantity is None) == (delta is None):
+        raise ValueError('pass exactly one of quantity or delta')
+    if quantity is not None:
+        new_value = max(int(quantity), 0)
+    else:
+        shifted = Item.quantity + int(delta)
+        new_value = db.case((shifted < 0, 0), else_=shifted)
+    by_id = selection.get('ids') is not None
+    changes = [] if by_id else None
+    deltas = defaultdict(lambda: [0, 0, 0])
+    updated = 0
+    for clauses in _selections(user_id, **selection):
+        if by_id:
+            # Lock the rows (on PostgreSQL) so the quantities cannot change before the update
+            old = db.session.execute(
+                db.select(Item.name, Item.category, Item.quantity, Item.added_date).where(*clauses).with_for_update()
+            )
+            for name, category, old_quantity, added_date in old:
+                new_quantity = new_value if quantity is not None else max(old_quantity + int(delta), 0)
+                deltas[category][1] += new_quantity - old_quantity
+                changes.append((name, added_date, old_quantity, new_quantity))
+        statement = db.update(Item).where(*clauses).values(quantity=new_value)
+        updated += db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+    if updated:
+        if by_id:
+            rollup.apply_deltas(user_id, deltas)
+        else:
+            # A filter can match most of the inventory; re-derive this user's totals
+            rollup.rebuild_rollups(user_id)
+        bump_inventory_version(user_id)
+    db.session.commit()
+    return updated, changes
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import pickle
+import threading
+import time
+from flask import g, make_response, render_template, request, session
+from markupsafe import Markup
+from models import db, InventoryVersion
+
+
+# --- Backends ---
+# Both expose get/set/delete/clear; values are arbitrary picklable objects.
+class MemoryBackend:
+    """In-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries=1024, default_ttl=60):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Backend for any Redis-protocol server (Redis, Valkey, KeyDB, ...).
+
+    Eviction is left to the server (configure ``maxmemory-policy allkeys-lru``).
+    """
+
+    def __init__(self, client, default_ttl=60, prefix='swt:'):
+        self.client = client
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, default_ttl=60):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND points at Redis but the redis package is not installed')
+        return cls(redis.Redis.from_url(url), default_ttl)
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or self.default_ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def make_backend(url, max_entries=1024, default_ttl=60):
+    if url in (None, '', 'memory'):
+        return MemoryBackend(max_entries, default_ttl)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend.from_url(url, default_ttl)
+    raise ValueError(f'Unsupported CACHE_BACKEND: {url}')
+
+
+# --- Inventory versions ---
+def bump_inventory_version(*user_ids):
+    """Invalidate cached views for ``user_ids``; runs in the caller's transaction."""
+    for user_id in set(user_ids):
+        updated = db.session.execute(
+            db.update(InventoryVersion)
+            .where(InventoryVersion.user_id == user_id)
+            .values(version=InventoryVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.session.execute(db.insert(InventoryVersion).values(user_id=user_id, version=1))
+
+
+def inventory_version(user_id):
+    versions = g.setdefault('inventory_versions', {})
+    if user_id not in versions:
+        versions[user_id] = db.session.execute(
+            db.select(InventoryVersion.version).where(InventoryVersion.user_id == user_id)
+        ).scalar() or 0
+    return versions[user_id]
+
+
+# --- View cache ---
+class ViewCache:
+    """Per-user cache of view data and rendered fragments.
+
+    Keys embed the user's inventory version, so any write makes every earlier
+    entry unreachable; stale entries then age out through LRU/TTL eviction.
+    The TTL also bounds how long time-dependent results (the surplus window,
+    expiry states) are served after they change without a write.
+    """
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or MemoryBackend(default_ttl=ttl)
+        self.ttl = ttl
+        self.enabled = True
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_TTL', 60)
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        self.backend = make_backend(app.config.get('CACHE_BACKEND'), app.config.get('CACHE_MAX_ENTRIES', 1024), self.ttl)
+        app.extensions['view_cache'] = self
+
+    def key(self, user_id, name):
+        return f'{user_id}:{inventory_version(user_id)}:{name}'
+
+    def cached(self, user_id, name, compute):
+        if not self.enabled:
+            return compute()
+        key = self.key(user_id, name)
+        value = self.backend.get(key)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def fragment(self, user_id, name, template, context):
+        """Rendered ``template`` for this user, built from ``context()`` on a miss."""
+        html = self.cached(user_id, 'fragment:' + name, lambda: render_template(template, **context()))
+        return Markup(html)
+
+    def etag(self, user_id, name):
+        # The time bucket makes ETags roll over with the TTL, like cache entries do
+        bucket = int(time.time() // max(self.ttl, 1))
+        raw = f'{user_id}:{inventory_version(user_id)}:{name}:{request.full_path}:{bucket}'
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def conditional(self, name):
+        """Decorator: answer with 304 when the client's ETag is still current."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                etag = self.etag(session['user_id'], name)
+                if request.if_none_match.contains_weak(etag):
+                    response = make_response('', 304)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                response.set_etag(etag, weak=True)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+            return wrapper
+        return decorator
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from models import db, Item
+from expiry import EXPIRING_DAYS, FRESH, EXPIRING, EXPIRED
+
+
+# --- Engine configuration ---
+def normalize_database_url(url):
+    # Heroku and some other hosts still hand out the postgres:// scheme, which SQLAlchemy rejects
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(app):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for the configured database backend."""
+    backend = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    if backend == 'sqlite':
+        # Busy waits happen inside SQLite (see busy_timeout below), not in the driver
+        return {'connect_args': {'timeout': app.config['SQLITE_BUSY_TIMEOUT'] / 1000}}
+    return {
+        'pool_size': app.config['DB_POOL_SIZE'],
+        'max_overflow': app.config['DB_MAX_OVERFLOW'],
+        'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+        'pool_recycle': app.config['DB_POOL_RECYCLE'],
+        # Managed Postgres drops idle connections; test each one on checkout
+        'pool_pre_ping': True,
+    }
+
+
+def sqlite_pragmas(app):
+    return {
+        # Readers no longer block on the writer, and vice versa. WAL needs shared
+        # memory, so use DELETE when the file lives on a network filesystem.
+        'journal_mode': app.config['SQLITE_JOURNAL_MODE'],
+        # Safe with WAL: a crash can lose the last transactions but never corrupts
+        'synchronous': 'NORMAL',
+        'busy_timeout': app.config['SQLITE_BUSY_TIMEOUT'],
+        'mmap_size': app.config['SQLITE_MMAP_SIZE'],
+    }
+
+
+def init_app(app):
+    """``db.init_app`` with backend-specific engine options and SQLite PRAGMAs."""
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS still win over the defaults
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options(app), **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(app)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+# --- Migrations ---
+# Each step inspects the live schema and only changes what is missing, so
+# `flask --app app migrate` is safe to run on every deploy. Tables added since
+# the first release are created by db.create_all(); the steps below cover what
+# create_all() does not do for existing tables: new columns and new indexes.
+def _add_expiry_status(connection, inspector):
+    if 'expiry_status' in {column['name'] for column in inspector.get_columns('item')}:
+        return False
+    connection.execute(text(f"ALTER TABLE item ADD COLUMN expiry_status VARCHAR(10) NOT NULL DEFAULT '{FRESH}'"))
+    # Backfill with the same rule as expiry.expiry_status(); the sweeper takes over from here
+    now = datetime.now()
+    connection.execute(
+        db.update(Item).values(expiry_status=db.case(
+            (Item.expiry_date <= now, EXPIRED),
+            (Item.expiry_date < now + timedelta(days=EXPIRING_DAYS), EXPIRING),
+            else_=FRESH,
+        ))
+    )
+    return True
+
+
+def _create_item_indexes(connection, inspector):
+    existing = {index['name'] for index in inspector.get_indexes('item')}
+    created = False
+    for index in Item.__table__.indexes:
+        if index.name not in existing:
+            index.create(connection)
+            created = True
+    return created
+
+
+MIGRATIONS = [
+    ('add item.expiry_status', _add_expiry_status),
+    ('create item indexes', _create_item_indexes),
+]
+
+
+def migrate():
+    """Bring an existing database up to the current models; returns the steps applied."""
+    db.create_all()
+    applied = []
+    with db.engine.begin() as connection:
+        for name, step in MIGRATIONS:
+            if step(connection, inspect(connection)):
+                applied.append(name)
+    return applied
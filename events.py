@@ -0,0 +1,183 @@
+import json
+import logging
+import queue
+import threading
+import time
+from models import db, ExpiryEvent, InventoryVersion
+
+log = logging.getLogger(__name__)
+
+# Event types sent on /events
+ITEM_ADDED = 'item_added'          # {"item": <serialized item>}
+ITEMS_REMOVED = 'items_removed'    # {"ids": [...]}
+ITEMS_UPDATED = 'items_updated'    # {"ids": [...] | null, "quantity": n | null, "delta": n | null}
+EXPIRY = 'expiry'                  # {"item_id", "name", "state"}
+CHANGED = 'changed'                # inventory changed elsewhere; refetch what is shown
+RESYNC = 'resync'                  # events were dropped; refetch what is shown
+
+
+class Subscription:
+    """One open event stream: a bounded queue of ``(event, data)`` pairs."""
+
+    def __init__(self, user_id, max_pending):
+        self.user_id = user_id
+        self.queue = queue.Queue(max_pending)
+        self.overflowed = False
+
+    def put(self, event, data):
+        try:
+            self.queue.put_nowait((event, data))
+        except queue.Full:
+            # A stalled client gets one resync instead of an unbounded backlog
+            self.overflowed = True
+
+
+class EventBroker:
+    """In-process pub/sub of inventory changes, streamed to browsers as SSE.
+
+    The item write routes publish deltas to the subscribers in this process.
+    Changes made by other gunicorn workers or by scheduled jobs are picked up
+    by a single poller thread. Once per ``poll_interval`` it reads the
+    inventory versions and new expiry events of every subscribed user, so
+    that costs one pair of queries per worker, not per connection.
+
+    Streams only wait on a queue, so with gevent workers each idle connection
+    is a parked greenlet. Sync workers would block for the whole stream, so
+    streams end after ``stream_seconds`` and the browser reconnects.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.heartbeat = 15
+        self.poll_interval = 5
+        self.stream_seconds = 25
+        self.max_pending = 100
+        self._subscribers = {}
+        self._versions = {}
+        self._last_expiry_id = 0
+        self._lock = threading.Lock()
+        self._poller = None
+
+    def init_app(self, app):
+        self.app = app
+        self.heartbeat = app.config.get('EVENTS_HEARTBEAT', 15)
+        self.poll_interval = app.config.get('EVENTS_POLL_INTERVAL', 5)
+        self.stream_seconds = app.config.get('EVENTS_STREAM_SECONDS', 25)
+        app.extensions['events'] = self
+
+    # --- Publishing ---
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, event, data=None):
+        """Send ``event`` to the user's streams in this process; call after commit."""
+        if not self.has_subscribers(user_id):
+            return
+        # Record the version this change produced so the poller does not report it again
+        version = db.session.execute(
+            db.select(InventoryVersion.version).where(InventoryVersion.user_id == user_id)
+        ).scalar()
+        with self._lock:
+            self._versions[user_id] = version
+        self._deliver(user_id, event, data or {})
+
+    def _deliver(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.put(event, data)
+
+    # --- Streams ---
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        self._start_poller()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+                    self._versions.pop(subscription.user_id, None)
+
+    def stream(self, user_id):
+        """Generator of SSE frames for one client; unsubscribes when the client goes away."""
+        subscription = self.subscribe(user_id)
+        deadline = time.monotonic() + self.stream_seconds
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    yield format_event(RESYNC, {})
+                try:
+                    event, data = subscription.queue.get(timeout=min(self.heartbeat, remaining))
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_event(event, data)
+        finally:
+            self.unsubscribe(subscription)
+
+    # --- Cross-process changes ---
+    def _start_poller(self):
+        with self._lock:
+            if self._poller is not None:
+                return
+            # Start from now; earlier expiry events are already reflected in the pages. A
+            # short-lived connection, so the open stream does not hold a transaction.
+            with db.engine.connect() as connection:
+                self._last_expiry_id = connection.execute(db.select(db.func.max(ExpiryEvent.id))).scalar() or 0
+            self._poller = threading.Thread(target=self._poll_forever, name='swt-events', daemon=True)
+        self._poller.start()
+
+    def _poll_forever(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if not self._subscribers:
+                continue
+            try:
+                with self.app.app_context():
+                    self.poll()
+            except Exception:
+                log.exception('Event poll failed')
+
+    def poll(self):
+        with self._lock:
+            user_ids = list(self._subscribers)
+        if not user_ids:
+            return
+        expiries = (
+            db.session.query(ExpiryEvent)
+            .filter(ExpiryEvent.id > self._last_expiry_id, ExpiryEvent.user_id.in_(user_ids))
+            .order_by(ExpiryEvent.id)
+            .all()
+        )
+        for expiry in expiries:
+            self._last_expiry_id = expiry.id
+            self._deliver(expiry.user_id, EXPIRY, {'item_id': expiry.item_id, 'name': expiry.item_name,
+                                                   'state': expiry.state})
+        versions = dict(db.session.execute(
+            db.select(InventoryVersion.user_id, InventoryVersion.version).where(InventoryVersion.user_id.in_(user_ids))
+        ).all())
+        db.session.rollback()
+        for user_id in user_ids:
+            version = versions.get(user_id, 0)
+            with self._lock:
+                previous = self._versions.get(user_id)
+                self._versions[user_id] = version
+            if previous is not None and version != previous:
+                self._deliver(user_id, CHANGED, {'version': version})
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
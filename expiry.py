@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from models import db, Item, ExpiryEvent
+from cache import bump_inventory_version
+
+EXPIRING_DAYS = 7
+FRESH, EXPIRING, EXPIRED = 'fresh', 'expiring', 'expired'
+
+
+def expiry_status(expiry_date, now=None):
+    """Status an item with ``expiry_date`` should have at ``now``."""
+    now = now or datetime.now()
+    if expiry_date <= now:
+        return EXPIRED
+    if expiry_date < now + timedelta(days=EXPIRING_DAYS):
+        return EXPIRING
+    return FRESH
+
+
+def _advance(state, *clauses):
+    """Set ``state`` on the items matching ``clauses``; returns their ``(id, user_id, name)`` rows."""
+    statement = (
+        db.update(Item)
+        .where(*clauses)
+        .values(expiry_status=state)
+        .execution_options(synchronize_session=False)
+    )
+    if getattr(db.engine.dialect, 'update_returning', False):
+        return db.session.execute(statement.returning(Item.id, Item.user_id, Item.name)).all()
+    rows = db.session.query(Item.id, Item.user_id, Item.name).filter(*clauses).all()
+    db.session.execute(statement)
+    return rows
+
+
+def sweep_expiry(now=None):
+    """Scheduler job: move every item whose state is behind ``now`` to its current state.
+
+    Items are selected by state and expiry date through the
+    ``ix_item_status_expiry`` index, not by id, so rows committed by any
+    worker in any order are found on the next tick. Expired runs first, so
+    an overdue fresh item goes straight to expired with a single event.
+    Returns the committed ``ExpiryEvent`` rows.
+    """
+    now = now or datetime.now()
+    expired = _advance(EXPIRED, Item.expiry_status.in_((FRESH, EXPIRING)), Item.expiry_date <= now)
+    expiring = _advance(EXPIRING, Item.expiry_status == FRESH,
+                        Item.expiry_date < now + timedelta(days=EXPIRING_DAYS))
+    events = [
+        ExpiryEvent(item_id=row.id, user_id=row.user_id, item_name=row.name, state=state, created_at=now)
+        for state, rows in ((EXPIRED, expired), (EXPIRING, expiring))
+        for row in rows
+    ]
+    if events:
+        db.session.add_all(events)
+        bump_inventory_version(*(event.user_id for event in events))
+    db.session.commit()
+    return events
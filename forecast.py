@@ -0,0 +1,279 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import multiprocessing
+import time
+import numpy as np
+from models import db, Item, WastePrediction
+from snapshot import SNAPSHOT_COLUMNS
+
+DAY_SECONDS = 86400.0
+# Below this many purchases a least-squares slope is noise; use the mean rate
+MIN_FIT_POINTS = 3
+# Floor for the observed span, so one recent purchase does not imply a huge rate
+MIN_SPAN_DAYS = 7.0
+# Incremental runs rescore only the groups with new purchases, unless there are
+# more than this many; then every item is scored, as in a full refit
+MAX_RESCORE_GROUPS = 500
+# Rows of the sufficient-statistics matrix, one column per (user, name) group
+N, SX, SY, SXY, SXX, TOTAL, FIRST_DAY = range(7)
+
+
+# --- Vectorized model ---
+# Everything below works on whole arrays: one row per purchase or item, and an
+# integer group code per row that stands for its (user_id, name) pair. These
+# functions run in the forecast process pool, so they take and return plain
+# NumPy arrays only.
+def empty_statistics(n_groups):
+    stats = np.zeros((7, n_groups))
+    stats[FIRST_DAY] = np.inf
+    return stats
+
+
+def grouped_cumsum(codes, values):
+    """Running total of ``values`` within each code; rows must be sorted by code."""
+    totals = np.cumsum(values)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    offsets = np.repeat(totals[starts] - values[starts], np.diff(np.r_[starts, len(codes)]))
+    return totals - offsets
+
+
+def fit_statistics(stats, codes, days, quantities):
+    """Fold new purchases into the per-group least-squares sums.
+
+    Each group is modelled as cumulative quantity bought against time, whose
+    slope is its consumption rate. Only sums are kept, so adding rows is an
+    update rather than a refit from scratch.
+    """
+    n_groups = stats.shape[1]
+    if len(codes) == 0:
+        return stats
+    order = np.lexsort((days, codes))
+    codes, days, quantities = codes[order], days[order], quantities[order]
+    # Cumulative quantity continues from each group's previous total
+    y = stats[TOTAL][codes] + grouped_cumsum(codes, quantities)
+    stats = stats.copy()
+    stats[N] += np.bincount(codes, minlength=n_groups)
+    stats[SX] += np.bincount(codes, days, n_groups)
+    stats[SY] += np.bincount(codes, y, n_groups)
+    stats[SXY] += np.bincount(codes, days * y, n_groups)
+    stats[SXX] += np.bincount(codes, days * days, n_groups)
+    stats[TOTAL] += np.bincount(codes, quantities, n_groups)
+    np.minimum.at(stats[FIRST_DAY], codes, days)
+    return stats
+
+
+def consumption_rates(stats, today):
+    """Units per day for every group; NaN where the group has no history."""
+    n, sx, sy, sxy, sxx = stats[N], stats[SX], stats[SY], stats[SXY], stats[SXX]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = n * sxx - sx * sx
+        slope = (n * sxy - sx * sy) / denominator
+        span = np.maximum(today - stats[FIRST_DAY], MIN_SPAN_DAYS)
+        mean_rate = stats[TOTAL] / span
+    fitted = (n >= MIN_FIT_POINTS) & (denominator > 1e-9) & (slope > 0)
+    rates = np.where(fitted, slope, mean_rate)
+    rates[n == 0] = np.nan
+    return rates
+
+
+def predict_waste(rates, codes, expiry_days, quantities, today):
+    """Quantity of each item expected to be left over when it expires.
+
+    Stock of the same name is assumed to be used first-expiring-first, so an
+    item is at risk when everything expiring up to and including it exceeds
+    what the group's rate consumes before its expiry date.
+    """
+    waste = np.zeros(len(codes))
+    known = codes >= 0
+    if not known.any():
+        return waste
+    index = np.flatnonzero(known)
+    order = index[np.lexsort((expiry_days[index], codes[index]))]
+    stock_through = grouped_cumsum(codes[order], quantities[order])
+    rate = rates[codes[order]]
+    consumed = np.nan_to_num(rate) * np.maximum(expiry_days[order] - today, 0)
+    leftover = np.clip(stock_through - consumed, 0, quantities[order])
+    leftover[np.isnan(rate)] = 0
+    waste[order] = leftover
+    return waste
+
+
+def fit_and_predict(stats, purchases, items, today):
+    """Process pool entry point: update the model and score current items."""
+    stats = fit_statistics(stats, *purchases)
+    rates = consumption_rates(stats, today)
+    return stats, rates, predict_waste(rates, *items, today)
+
+
+# --- Model cache ---
+class ConsumptionModel:
+    """Per-process state of the fitted model: group codes plus least-squares sums."""
+
+    def __init__(self, epoch):
+        self.epoch = epoch
+        self.name_codes = {}
+        self.group_codes = {}
+        self.stats = empty_statistics(0)
+        self.fitted_at = time.monotonic()
+        # Purchases are found by added_date. Rows added within the commit margin
+        # of the last run are read again next time, and skipped if already seen.
+        self.last_run = None
+        self.recent_ids = set()
+
+    def days(self, dates):
+        # Much faster than np.array(dates, dtype='datetime64[us]') on datetime objects
+        epoch = self.epoch
+        return np.fromiter(((date - epoch).total_seconds() for date in dates), float, len(dates)) / DAY_SECONDS
+
+    def encode(self, user_ids, names, add=False):
+        """Group code of each ``(user_id, name)`` pair; -1 for unseen pairs unless ``add``.
+
+        Names are factorized with ``np.unique`` so the dictionaries are only
+        consulted once per distinct name and pair, not once per row.
+        """
+        if not len(names):
+            return np.zeros(0, dtype=np.int64)
+        unique_names, name_inverse = np.unique(np.array(names, dtype=object), return_inverse=True)
+        if add:
+            for name in unique_names.tolist():
+                self.name_codes.setdefault(name, len(self.name_codes))
+        name_codes = np.array([self.name_codes.get(name, -1) for name in unique_names.tolist()])[name_inverse]
+        pairs = np.asarray(user_ids, dtype=np.int64) << 32 | np.where(name_codes >= 0, name_codes, 0)
+        unique_pairs, pair_inverse = np.unique(pairs, return_inverse=True)
+        if add:
+            for pair in unique_pairs.tolist():
+                self.group_codes.setdefault(pair, len(self.group_codes))
+        codes = np.array([self.group_codes.get(pair, -1) for pair in unique_pairs.tolist()])[pair_inverse]
+        codes[name_codes < 0] = -1
+        return codes
+
+    def grow(self):
+        missing = len(self.group_codes) - self.stats.shape[1]
+        if missing:
+            self.stats = np.concatenate([self.stats, empty_statistics(missing)], axis=1)
+
+
+class Forecaster:
+    """Scheduler job: refit consumption rates and store waste predictions.
+
+    The model is fitted from purchases (item rows) added in the last
+    ``lookback`` days. Later runs only fold in rows whose ``added_date`` is
+    after the previous run, less ``commit_margin``: ids are assigned before
+    commit, so a high-water id would skip rows that commit out of order.
+    Only items in the (user, name) groups that gained purchases are rescored.
+    Everything is rebuilt from scratch every ``refit_interval`` seconds,
+    which also drops deleted rows, picks up imports with older added dates,
+    rescores every item and slides the lookback window. Fitting and scoring
+    run in a process pool so the numeric work never holds up a web request;
+    predictions are written to the ``waste_prediction`` table, where every
+    worker's recommendations read them.
+    """
+
+    def __init__(self, lookback_days=90, refit_interval=6 * 3600, processes=1):
+        self.lookback = timedelta(days=lookback_days)
+        # Longest a write may take between setting added_date and committing
+        self.commit_margin = timedelta(minutes=10)
+        self.refit_interval = refit_interval
+        self.processes = processes
+        self.model = None
+        self._pool = None
+
+    def init_app(self, app):
+        self.lookback = timedelta(days=app.config.get('FORECAST_LOOKBACK_DAYS', 90))
+        self.refit_interval = app.config.get('FORECAST_REFIT_INTERVAL', 6 * 3600)
+        self.processes = app.config.get('FORECAST_PROCESSES', 1)
+        app.extensions['forecaster'] = self
+
+    def _run(self, *args):
+        if not self.processes:
+            return fit_and_predict(*args)
+        if self._pool is None:
+            # spawn: forking a threaded web worker is unsafe
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool.submit(fit_and_predict, *args).result()
+
+    def __call__(self, now=None):
+        now = now or datetime.now()
+        full = self.model is None or time.monotonic() - self.model.fitted_at > self.refit_interval
+        if full:
+            self.model = ConsumptionModel(epoch=now - self.lookback)
+        model = self.model
+        since = now - self.lookback
+        if model.last_run is not None:
+            since = max(since, model.last_run - self.commit_margin)
+        rows = (
+            db.session.query(Item.id, Item.user_id, Item.name, Item.quantity, Item.added_date)
+            .filter(Item.added_date >= since)
+            .all()
+        )
+        purchases = [row for row in rows if row.id not in model.recent_ids]
+        model.last_run = now
+        model.recent_ids = {row.id for row in rows if row.added_date >= now - self.commit_margin}
+        items = db.session.query(Item.id, Item.user_id, Item.name, Item.quantity, Item.expiry_date).filter(Item.expiry_date > now)
+        changed = None
+        if not full:
+            changed = {(row.user_id, row.name) for row in purchases}
+            if not changed:
+                return 0
+            if len(changed) > MAX_RESCORE_GROUPS:
+                changed = None
+            else:
+                items = items.filter(db.tuple_(Item.user_id, Item.name).in_(changed))
+        items = items.all()
+        purchase_cols = list(zip(*purchases)) or [()] * 5
+        item_cols = list(zip(*items)) or [()] * 5
+        purchase_codes = model.encode(purchase_cols[1], purchase_cols[2], add=True)
+        item_codes = model.encode(item_cols[1], item_cols[2])
+        model.grow()
+        stats, rates, waste = self._run(
+            model.stats,
+            (purchase_codes, model.days(purchase_cols[4]), np.array(purchase_cols[3], dtype=float)),
+            (item_codes, model.days(item_cols[4]), np.array(item_cols[3], dtype=float)),
+            model.days([now])[0],
+        )
+        model.stats = stats
+        return self.store(items, item_codes, rates, waste, now, changed)
+
+    def store(self, items, item_codes, rates, waste, now, groups=None):
+        """Replace the stored predictions of ``groups`` (all if None) with this run's.
+
+        Returns how many of the scored items are at risk.
+        """
+        at_risk = np.flatnonzero(waste > 0)
+        rows = [
+            {'item_id': items[i].id, 'user_id': items[i].user_id, 'predicted_waste': float(waste[i]),
+             'daily_rate': float(rates[item_codes[i]]), 'predicted_at': now}
+            for i in at_risk.tolist()
+        ]
+        stale = db.delete(WastePrediction)
+        if groups is not None:
+            stale = stale.where(WastePrediction.item_id.in_(
+                db.select(Item.id).where(db.tuple_(Item.user_id, Item.name).in_(groups))
+            ))
+        db.session.execute(stale)
+        if rows:
+            db.session.execute(db.insert(WastePrediction), rows)
+        db.session.commit()
+        return len(rows)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# --- Reads ---
+def at_risk_items(user_id, limit=10):
+    """The user's items with the largest predicted waste, as ``SNAPSHOT_COLUMNS`` rows.
+
+    Rows carry ``predicted_waste`` and ``daily_rate``. Predictions for items
+    deleted or expired since they were made drop out through the join.
+    """
+    return (
+        db.session.query(*SNAPSHOT_COLUMNS, WastePrediction.predicted_waste, WastePrediction.daily_rate)
+        .join(WastePrediction, WastePrediction.item_id == Item.id)
+        .filter(WastePrediction.user_id == user_id, Item.user_id == user_id, Item.expiry_date > datetime.now())
+        .order_by(WastePrediction.predicted_waste.desc(), Item.id)
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,40 @@
+# Picked up automatically by `gunicorn app:app` (see Procfile)
+import glob
+import os
+import tempfile
+
+# Workers share their metrics through this directory so /metrics reports the
+# totals of every worker, whichever one answers the scrape
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'smart-waste-tracker-metrics'))
+
+# /events keeps one connection open per browser tab. With gevent workers each
+# idle stream is a parked greenlet, and a worker serves up to worker_connections
+# of them. A sync worker could hold only one, blocking every other request, so
+# live updates are off unless they are explicitly enabled for sync workers.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+if worker_class == 'gevent':
+    os.environ.setdefault('EVENTS_STREAM_SECONDS', '3600')
+else:
+    os.environ.setdefault('EVENTS_ENABLED', '0')
+
+
+def on_starting(server):
+    # Counters restart with the server: drop files left by a previous run
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], '*.pickle*')):
+        os.remove(path)
+
+
+def post_worker_init(worker):
+    # Each worker starts the scheduler thread; a file lock lets only one run jobs
+    from app import start_background_jobs
+    start_background_jobs()
+
+
+def worker_exit(server, worker):
+    # Release the scheduler lock at once, reap the forecast process pool and
+    # leave this worker's final metrics for the others to report
+    from app import metrics, stop_background_jobs
+    stop_background_jobs()
+    if metrics.enabled:
+        metrics.flush()
@@ -0,0 +1,286 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+import glob
+import os
+import pickle
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 500)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+
+class CountingCursor:
+    """DB-API cursor proxy that adds the rows fetched through it to a request's count.
+
+    Rows are counted as the result is consumed, so nothing is buffered or
+    fetched twice; a streamed result is counted as it streams.
+    """
+
+    def __init__(self, cursor, data):
+        self._cursor = cursor
+        self._data = data
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._data['rows'] += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._data['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._data['rows'] += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _labels(pairs):
+    inner = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + inner + '}' if inner else ''
+
+
+class Metrics:
+    """Opt-in request, SQL and stage instrumentation.
+
+    Per-request numbers are accumulated on ``flask.g`` and folded into the
+    process-wide registry in ``after_request``; the registry is rendered as
+    Prometheus text on ``/metrics``.
+
+    Under gunicorn each worker has its own registry, and a scrape is answered
+    by whichever worker accepts it. With ``directory`` set (gunicorn.conf.py
+    sets ``METRICS_DIR``), every worker writes its registry there every
+    ``flush_interval`` seconds and on exit, and ``/metrics`` sums all the
+    files, so every scrape sees the totals of all workers, past and present.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.server_timing = False
+        self.directory = None
+        self.flush_interval = 5
+        self._lock = threading.Lock()
+        self._flusher = None
+        self.request_latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.request_queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.stage_latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.requests_total = defaultdict(int)
+        self.query_seconds = defaultdict(float)
+        self.rows_total = defaultdict(int)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        self.server_timing = app.config.get('SERVER_TIMING', False)
+        self.directory = app.config.get('METRICS_DIR') or None
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.render)
+        from flask import before_render_template, template_rendered
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    # --- Per-request accounting ---
+    def _before_request(self):
+        if self.directory is not None and self._flusher is None:
+            self._start_flusher()
+        g.metrics = {'start': time.perf_counter(), 'queries': 0, 'query_seconds': 0.0, 'rows': 0,
+                     'stages': defaultdict(float)}
+
+    def _after_request(self, response):
+        data = g.pop('metrics', None)
+        if data is None:
+            return response
+        elapsed = time.perf_counter() - data['start']
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        with self._lock:
+            self.request_latency[(route, request.method)].observe(elapsed)
+            self.request_queries[route].observe(data['queries'])
+            self.requests_total[(route, request.method, response.status_code)] += 1
+            self.query_seconds[route] += data['query_seconds']
+            self.rows_total[route] += data['rows']
+            for name, seconds in data['stages'].items():
+                self.stage_latency[name].observe(seconds)
+        if self.server_timing:
+            parts = [f'total;dur={elapsed * 1000:.1f}',
+                     f'db;dur={data["query_seconds"] * 1000:.1f};desc="{data["queries"]} queries, {data["rows"]} rows"']
+            parts += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in data['stages'].items()]
+            response.headers['Server-Timing'] = ', '.join(parts)
+        return response
+
+    def _current(self):
+        return g.get('metrics') if has_request_context() else None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a named stage (forecast, expiry_queue, render, ...) of the current request."""
+        data = self._current() if self.enabled else None
+        if data is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            data['stages'][name] += time.perf_counter() - start
+
+    # --- Signal and event hooks ---
+    def _before_render(self, sender, template, context, **extra):
+        data = self._current()
+        if data is not None:
+            data.setdefault('render_start', []).append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        data = self._current()
+        if data is not None and data.get('render_start'):
+            data['stages']['render'] += time.perf_counter() - data['render_start'].pop()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('metrics_query_start')
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        data = self._current()
+        if data is not None:
+            data['queries'] += 1
+            data['query_seconds'] += elapsed
+            if cursor.description is not None and context is not None:
+                # The result is built from context.cursor after this hook runs
+                context.cursor = CountingCursor(cursor, data)
+
+    # --- Multi-worker aggregation ---
+    def _state(self):
+        histograms = ('request_latency', 'request_queries', 'stage_latency')
+        counters = ('requests_total', 'query_seconds', 'rows_total')
+        with self._lock:
+            state = {name: {key: (h.counts[:], h.total, h.count) for key, h in getattr(self, name).items()}
+                     for name in histograms}
+            state.update({name: dict(getattr(self, name)) for name in counters})
+        return state
+
+    def _merge(self, state):
+        for name in ('request_latency', 'request_queries', 'stage_latency'):
+            for key, values in state[name].items():
+                getattr(self, name)[key].merge(*values)
+        for name in ('requests_total', 'query_seconds', 'rows_total'):
+            for key, value in state[name].items():
+                getattr(self, name)[key] += value
+
+    def _path(self, pid=None):
+        return os.path.join(self.directory, f'{pid or os.getpid()}.pickle')
+
+    def flush(self):
+        """Write this worker's registry to ``directory`` (atomically replacing its last copy)."""
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path()
+        with open(path + '.tmp', 'wb') as fh:
+            pickle.dump(self._state(), fh)
+        os.replace(path + '.tmp', path)
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name='swt-metrics', daemon=True)
+        self._flusher.start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _collect(self):
+        """A registry summing this worker's live numbers and every other worker's last flush."""
+        merged = Metrics()
+        merged._merge(self._state())
+        if self.directory is not None:
+            own = self._path()
+            for path in glob.glob(os.path.join(self.directory, '*.pickle')):
+                if path == own:
+                    continue
+                try:
+                    with open(path, 'rb') as fh:
+                        merged._merge(pickle.load(fh))
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    continue  # a worker is replacing its file; it is counted on the next scrape
+        return merged
+
+    # --- Exposition ---
+    def render(self):
+        return Response(self._collect()._render(), mimetype='text/plain; version=0.0.4')
+
+    def _render(self):
+        lines = []
+        with self._lock:
+            self._histogram(lines, 'swt_http_request_duration_seconds', 'Request latency by route',
+                            {(('route', r), ('method', m)): h for (r, m), h in self.request_latency.items()})
+            self._histogram(lines, 'swt_db_queries_per_request', 'SQL statements per request',
+                            {(('route', r),): h for r, h in self.request_queries.items()})
+            self._histogram(lines, 'swt_stage_duration_seconds', 'Time per named stage',
+                            {(('stage', s),): h for s, h in self.stage_latency.items()})
+            lines += ['# HELP swt_http_requests_total Requests by route and status',
+                      '# TYPE swt_http_requests_total counter']
+            lines += [f'swt_http_requests_total{_labels((("route", r), ("method", m), ("status", s)))} {v}'
+                      for (r, m, s), v in sorted(self.requests_total.items())]
+            lines += ['# HELP swt_db_query_seconds_total Time spent in SQL by route',
+                      '# TYPE swt_db_query_seconds_total counter']
+            lines += [f'swt_db_query_seconds_total{_labels((("route", r),))} {v:.6f}'
+                      for r, v in sorted(self.query_seconds.items())]
+            lines += ['# HELP swt_db_rows_total Rows fetched from the database by route',
+                      '# TYPE swt_db_rows_total counter']
+            lines += [f'swt_db_rows_total{_labels((("route", r),))} {v}' for r, v in sorted(self.rows_total.items())]
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram(lines, name, help_text, series):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for labels, hist in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {hist.count}')
+            lines.append(f'{name}_sum{_labels(labels)} {hist.total:.6f}')
+            lines.append(f'{name}_count{_labels(labels)} {hist.count}')
@@ -24,6 +24,75 @@ class Item(db.Model):
     added_date = db.Column(db.DateTime, default=datetime.utcnow)
     expiry_date = db.Column(db.DateTime, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # 'fresh' -> 'expiring' -> 'expired'; set on insert and advanced by the expiry sweeper
+    expiry_status = db.Column(db.String(10), nullable=False, default='fresh', server_default='fresh')
+
+    __table_args__ = (
+        # Serves "earliest expiries for a user" as an index range scan + LIMIT
+        db.Index('ix_item_user_expiry', 'user_id', 'expiry_date'),
+        # Serves the batched per-name lookup used by recommendations
+        db.Index('ix_item_user_name', 'user_id', 'name'),
+        # Serves category filters and the per-category rollup rebuild
+        db.Index('ix_item_user_category', 'user_id', 'category'),
+        # Serves the expiry sweeper's per-tick range updates
+        db.Index('ix_item_status_expiry', 'expiry_status', 'expiry_date'),
+        # Serves the forecaster's "purchases since the last run" range scan
+        db.Index('ix_item_added_date', 'added_date'),
+    )
+
+    def __repr__(self):
+        return f'<Item {self.name}>'
+
+
+class CategoryRollup(db.Model):
+    """Per-user, per-category item summary kept in step with the item table."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.Integer, nullable=False, default=0)
+    expiring_count = db.Column(db.Integer, nullable=False, default=0)
+    # Set by a full rebuild; NULL marks a row first created by an incremental write
+    refreshed_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<CategoryRollup {self.user_id}:{self.category}>'
+
+
+class ExpiryEvent(db.Model):
+    """An item crossing into the 'expiring' or 'expired' state."""
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key: events outlive the items they describe
+    item_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    item_name = db.Column(db.String(100), nullable=False)
+    state = db.Column(db.String(10), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_expiry_event_user_created', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<ExpiryEvent {self.item_name} {self.state}>'
+
+
+class InventoryVersion(db.Model):
+    """Per-user counter bumped by every item write; keys the view cache and ETags."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<InventoryVersion {self.user_id}:{self.version}>'
+
+
+class WastePrediction(db.Model):
+    """Forecast leftover quantity of an item at its expiry date (see forecast.py)."""
+    # No foreign key: rows are replaced wholesale by each forecast run
+    item_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    predicted_waste = db.Column(db.Float, nullable=False)
+    daily_rate = db.Column(db.Float, nullable=False)
+    predicted_at = db.Column(db.DateTime, nullable=False)
 
     def __repr__(self):
-        return f'<Item {self.name}>' 
\ No newline at end of file
+        return f'<WastePrediction {self.item_id}: {self.predicted_waste:.1f}>'
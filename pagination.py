@@ -0,0 +1,92 @@
+import base64
+from datetime import datetime
+from models import db, Item
+from snapshot import SNAPSHOT_COLUMNS
+from expiry import FRESH
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+STATUSES = ('surplus', 'expiring', 'normal')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    raw = f'{row.expiry_date.isoformat()}|{row.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        expiry, item_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(expiry), int(item_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def is_expiring(row):
+    # Precomputed by the expiry sweeper; covers both 'expiring' and 'expired'
+    return row.expiry_status != FRESH
+
+
+def item_status(row, surplus):
+    if row.name in surplus:
+        return 'surplus'
+    if is_expiring(row):
+        return 'expiring'
+    return 'normal'
+
+
+def serialize_item(row, status):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'category': row.category,
+        'quantity': row.quantity,
+        'shelf_life': row.shelf_life,
+        'location': row.location,
+        'added_date': row.added_date.isoformat() if row.added_date else None,
+        'expiry_date': row.expiry_date.isoformat(),
+        'status': status,
+        'expiring_soon': is_expiring(row),
+    }
+
+
+def inventory_page(user_id, surplus, category=None, location=None, status=None, q=None,
+                   cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """One page of a user's items ordered by ``(expiry_date, id)``.
+
+    Filtering happens in SQL and pagination is keyset-based, so the cost of a
+    page does not depend on how deep into the inventory it is. ``surplus`` is
+    the list of surplus item names used to derive each row's status.
+    """
+    surplus = set(surplus)
+    query = db.session.query(*SNAPSHOT_COLUMNS).filter(Item.user_id == user_id)
+    if category:
+        query = query.filter(Item.category == category)
+    if location:
+        query = query.filter(Item.location == location)
+    if q:
+        query = query.filter(Item.name.ilike(f'%{q}%'))
+    if status == 'surplus':
+        query = query.filter(Item.name.in_(surplus))
+    elif status in ('expiring', 'normal'):
+        if surplus:
+            query = query.filter(Item.name.not_in(surplus))
+        if status == 'expiring':
+            query = query.filter(Item.expiry_status != FRESH)
+        else:
+            query = query.filter(Item.expiry_status == FRESH)
+    if cursor:
+        after_expiry, after_id = decode_cursor(cursor)
+        query = query.filter(db.tuple_(Item.expiry_date, Item.id) > db.tuple_(after_expiry, after_id))
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Item.expiry_date, Item.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    items = [serialize_item(row, item_status(row, surplus)) for row in rows[:limit]]
+    return {'items': items, 'next_cursor': next_cursor}
+
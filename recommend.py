@@ -0,0 +1,60 @@
+from models import db, Item
+from snapshot import SNAPSHOT_COLUMNS
+
+# Categories whose surplus is better recycled than repurposed
+RECYCLE_CATEGORIES = frozenset(['Canned', 'Beverages', 'Frozen'])
+
+def first_item_by_name(user_id, names, snapshot=None):
+    """Map each name to the user's lowest-id item with that name.
+
+    Reads the already-loaded snapshot when there is one, otherwise issues one
+    query however many names are asked for: the names are a single expanding
+    ``IN`` parameter, so the ``MIN(id) ... GROUP BY name`` subquery only reads
+    the ``(user_id, name)`` index entries of the wanted names.
+    """
+    found = {}
+    if snapshot is not None:
+        wanted = set(names)
+        for row in snapshot:
+            if row.name in wanted and (row.name not in found or row.id < found[row.name].id):
+                found[row.name] = row
+        return found
+    first_ids = (
+        db.session.query(db.func.min(Item.id))
+        .filter(Item.user_id == user_id, Item.name.in_(list(names)))
+        .group_by(Item.name)
+    )
+    for row in db.session.query(*SNAPSHOT_COLUMNS).filter(Item.id.in_(first_ids.scalar_subquery())):
+        found[row.name] = row
+    return found
+
+
+def build_recommendations(user_id, soon_expiring, surplus, snapshot=None, at_risk=()):
+    """Classify items into Donate / Recycle / Repurpose actions.
+
+    ``at_risk`` holds items the forecaster expects to go unused before they
+    expire (rows with ``predicted_waste``); they are recommended for donation
+    alongside the soon-expiring ones.
+
+    Returns ``(recs, counts)`` where ``recs`` is the list rendered by the
+    recommendations page and ``counts`` holds ``donate_count``,
+    ``repurpose_count``, ``recycle_count`` and ``at_risk_count`` for analytics.
+    """
+    predicted = {item.id: item.predicted_waste for item in at_risk}
+    recs = [{'item': item, 'action': 'Donate', 'predicted_waste': predicted.get(item.id)} for item in soon_expiring]
+    listed = {item.id for item in soon_expiring}
+    recs += [{'item': item, 'action': 'Donate', 'predicted_waste': item.predicted_waste}
+             for item in at_risk if item.id not in listed]
+    counts = {'donate_count': len(recs), 'repurpose_count': 0, 'recycle_count': 0, 'at_risk_count': len(at_risk)}
+    by_name = first_item_by_name(user_id, surplus, snapshot) if surplus else {}
+    for name in surplus:
+        item = by_name.get(name)
+        if item is None:
+            continue
+        if item.category in RECYCLE_CATEGORIES:
+            recs.append({'item': item, 'action': 'Recycle', 'predicted_waste': predicted.get(item.id)})
+            counts['recycle_count'] += 1
+        else:
+            recs.append({'item': item, 'action': 'Repurpose', 'predicted_waste': predicted.get(item.id)})
+            counts['repurpose_count'] += 1
+    return recs, counts
@@ -0,0 +1,133 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from models import db, Item, CategoryRollup
+from expiry import EXPIRING_DAYS
+
+# Expiring counts drift as time passes without writes, so a user's rollup is
+# rebuilt on read once it is older than this
+DEFAULT_MAX_AGE = timedelta(hours=1)
+
+
+def expiring_cutoff(now=None):
+    return (now or datetime.now()) + timedelta(days=EXPIRING_DAYS)
+
+
+# --- Incremental maintenance ---
+# Called by the item write paths *before* they commit, so the rollup changes
+# in the same transaction as the items themselves.
+def collect_deltas(rows, sign=1, now=None):
+    """Fold ``(category, quantity, expiry_date)`` rows into per-category deltas."""
+    cutoff = expiring_cutoff(now)
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for category, quantity, expiry_date in rows:
+        delta = deltas[category]
+        delta[0] += sign
+        delta[1] += sign * quantity
+        if expiry_date < cutoff:
+            delta[2] += sign
+    return deltas
+
+
+def _upsert_statement(values):
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    statement = insert(CategoryRollup).values(values)
+    return statement.on_conflict_do_update(
+        index_elements=[CategoryRollup.user_id, CategoryRollup.category],
+        set_={
+            'item_count': CategoryRollup.item_count + statement.excluded.item_count,
+            'total_quantity': CategoryRollup.total_quantity + statement.excluded.total_quantity,
+            'expiring_count': CategoryRollup.expiring_count + statement.excluded.expiring_count,
+        },
+    )
+
+
+def apply_deltas(user_id, deltas):
+    if not deltas:
+        return
+    values = [
+        {'user_id': user_id, 'category': category, 'item_count': count,
+         'total_quantity': quantity, 'expiring_count': expiring, 'refreshed_at': None}
+        for category, (count, quantity, expiring) in deltas.items()
+    ]
+    statement = _upsert_statement(values)
+    if statement is not None:
+        db.session.execute(statement)
+    else:
+        for value in values:
+            updated = db.session.execute(
+                db.update(CategoryRollup)
+                .where(CategoryRollup.user_id == user_id, CategoryRollup.category == value['category'])
+                .values(item_count=CategoryRollup.item_count + value['item_count'],
+                        total_quantity=CategoryRollup.total_quantity + value['total_quantity'],
+                        expiring_count=CategoryRollup.expiring_count + value['expiring_count'])
+            ).rowcount
+            if not updated:
+                db.session.execute(db.insert(CategoryRollup).values(value))
+    db.session.execute(
+        db.delete(CategoryRollup).where(CategoryRollup.user_id == user_id, CategoryRollup.item_count <= 0)
+    )
+
+
+def record_added(user_id, rows, now=None):
+    apply_deltas(user_id, collect_deltas(rows, 1, now))
+
+
+def record_removed(user_id, rows, now=None):
+    apply_deltas(user_id, collect_deltas(rows, -1, now))
+
+
+# --- Reconciliation ---
+def rebuild_rollups(user_id=None, now=None):
+    """Recompute rollups from the item table with one ``INSERT ... SELECT ... GROUP BY``.
+
+    Rebuilds a single user when ``user_id`` is given, otherwise every user.
+    The caller commits.
+    """
+    now = now or datetime.now()
+    cutoff = expiring_cutoff(now)
+    grouped = (
+        db.select(
+            Item.user_id,
+            Item.category,
+            db.func.count(Item.id),
+            db.func.coalesce(db.func.sum(Item.quantity), 0),
+            db.func.coalesce(db.func.sum(db.case((Item.expiry_date < cutoff, 1), else_=0)), 0),
+            db.literal(now, db.DateTime),
+        )
+        .group_by(Item.user_id, Item.category)
+    )
+    clear = db.delete(CategoryRollup)
+    if user_id is not None:
+        grouped = grouped.where(Item.user_id == user_id)
+        clear = clear.where(CategoryRollup.user_id == user_id)
+    db.session.execute(clear)
+    db.session.execute(
+        db.insert(CategoryRollup).from_select(
+            ['user_id', 'category', 'item_count', 'total_quantity', 'expiring_count', 'refreshed_at'],
+            grouped,
+        )
+    )
+
+
+def reconcile_rollups():
+    """Periodic job: rebuild every user's rollup and commit."""
+    rebuild_rollups()
+    db.session.commit()
+
+
+# --- Reads ---
+def get_rollups(user_id, max_age=DEFAULT_MAX_AGE, now=None):
+    """Return the user's rollup rows, rebuilding them first if missing or stale."""
+    now = now or datetime.now()
+    rows = CategoryRollup.query.filter_by(user_id=user_id).order_by(CategoryRollup.category).all()
+    if not rows or any(row.refreshed_at is None or row.refreshed_at < now - max_age for row in rows):
+        rebuild_rollups(user_id, now)
+        db.session.commit()
+        rows = CategoryRollup.query.filter_by(user_id=user_id).order_by(CategoryRollup.category).all()
+    return rows
@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, assume a single process
+    fcntl = None
+
+try:
+    from gevent import monkey as gevent_monkey
+    from gevent.threadpool import ThreadPool
+except ImportError:  # gevent workers are optional
+    gevent_monkey = None
+
+log = logging.getLogger(__name__)
+
+
+class FileLock:
+    """Non-blocking exclusive lock on a file, held until released or the process exits."""
+
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+
+    @property
+    def held(self):
+        return self._handle is not None
+
+    def acquire(self):
+        if self._handle is not None:
+            return True
+        if fcntl is None:
+            self._handle = True
+            return True
+        handle = open(self.path, 'a+')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._handle = handle
+        return True
+
+    def release(self):
+        if self._handle is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+        self._handle = None
+
+
+class Scheduler:
+    """Runs periodic jobs on a daemon thread in whichever worker holds the lock.
+
+    Every gunicorn worker starts a scheduler, but only the one that wins the
+    file lock runs jobs; the others keep retrying once per tick so a replacement
+    takes over if the lock holder exits.
+
+    Under gevent workers the scheduler "thread" is a greenlet on the worker's
+    event loop, and NumPy and sqlite3 never yield to it. Jobs then run on one
+    native thread of their own, so open streams and requests keep being served
+    while a job runs. Resources a job creates there, such as the forecast
+    process pool, must also be released there (see ``call``).
+    """
+
+    def __init__(self, app, lock_path, tick=60):
+        self.app = app
+        self.lock = FileLock(lock_path)
+        self.tick = tick
+        self.jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._job_thread = None
+
+    def add_job(self, name, func, interval):
+        self.jobs.append({'name': name, 'func': func, 'interval': interval, 'next_run': 0.0})
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if gevent_monkey is not None and gevent_monkey.is_module_patched('threading'):
+            self._job_thread = ThreadPool(1)
+        self._thread = threading.Thread(target=self._run, name='swt-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.tick)
+            self._thread = None
+        self.lock.release()
+
+    def run_pending(self, now=None):
+        now = now if now is not None else time.monotonic()
+        for job in self.jobs:
+            if now < job['next_run']:
+                continue
+            job['next_run'] = now + job['interval']
+            self.call(self._run_job, job)
+
+    def call(self, func, *args):
+        """Run ``func`` on the thread jobs run on, waiting for its result."""
+        if self._job_thread is None:
+            return func(*args)
+        return self._job_thread.apply(func, args)
+
+    def _run_job(self, job):
+        with self.app.app_context():
+            try:
+                job['func']()
+            except Exception:
+                log.exception('Scheduled job %s failed', job['name'])
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.lock.acquire():
+                self.run_pending()
+            self._stop.wait(self.tick)
@@ -0,0 +1,96 @@
+from flask import g, session
+from collections import defaultdict
+import heapq
+from models import db, Item
+
+# Columns hydrated for a snapshot row. Rows are plain SQLAlchemy ``Row`` tuples,
+# so templates can keep using ``item.name`` / ``item.expiry_date`` without the
+# cost of building full ``Item`` objects and registering them in the session.
+SNAPSHOT_COLUMNS = (
+    Item.id,
+    Item.name,
+    Item.category,
+    Item.quantity,
+    Item.shelf_life,
+    Item.location,
+    Item.added_date,
+    Item.expiry_date,
+    Item.expiry_status,
+)
+
+
+class InventorySnapshot:
+    """A user's items loaded once and shared by every derived structure."""
+
+    def __init__(self, user_id, rows):
+        self.user_id = user_id
+        self.rows = rows
+        self._category_map = None
+
+    @classmethod
+    def load(cls, user_id):
+        rows = db.session.query(*SNAPSHOT_COLUMNS).filter(Item.user_id == user_id).all()
+        return cls(user_id, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    @property
+    def total_quantity(self):
+        return sum(row.quantity for row in self.rows)
+
+    def category_map(self):
+        if self._category_map is None:
+            category_map = defaultdict(list)
+            for row in self.rows:
+                category_map[row.category].append(row)
+            self._category_map = category_map
+        return self._category_map
+
+    def top_expiring(self, k):
+        return heapq.nsmallest(k, self.rows, key=expiry_key)
+
+
+def expiry_key(row):
+    # id breaks ties on expiry_date so ordering never falls through to the row
+    return (row.expiry_date, row.id)
+
+
+def query_top_expiring(user_id, k):
+    """Earliest ``k`` expiries for a user, ordered and limited in the database."""
+    return (
+        db.session.query(*SNAPSHOT_COLUMNS)
+        .filter(Item.user_id == user_id)
+        .order_by(Item.expiry_date, Item.id)
+        .limit(k)
+        .all()
+    )
+
+
+def get_snapshot(user_id=None):
+    """Return the current request's snapshot, loading it on first use."""
+    if user_id is None:
+        user_id = session['user_id']
+    snapshot = g.get('inventory_snapshot')
+    if snapshot is None or snapshot.user_id != user_id:
+        snapshot = InventorySnapshot.load(user_id)
+        g.inventory_snapshot = snapshot
+    return snapshot
+
+
+def peek_snapshot(user_id=None):
+    """Return the snapshot only if this request has already loaded it."""
+    if user_id is None:
+        user_id = session['user_id']
+    snapshot = g.get('inventory_snapshot')
+    if snapshot is not None and snapshot.user_id == user_id:
+        return snapshot
+    return None
+
+
+def invalidate_snapshot():
+    """Drop the cached snapshot after a write in the same request."""
+    g.pop('inventory_snapshot', None)
@@ -158,15 +158,17 @@ document.addEventListener('DOMContentLoaded', function() {
             transform: translateX(100%);
             transition: all 0.3s ease;
         `;
-        notification.innerHTML = `
-            <div style="display: flex; align-items: center; justify-content: space-between;">
-                <span>${message}</span>
-                <button onclick="this.parentElement.parentElement.remove()" 
-                        style="background: none; border: none; color: inherit; font-size: 1.2rem; cursor: pointer;">
-                    ×
-                </button>
-            </div>
-        `;
+        // Built from nodes so a message (e.g. an item name) is never parsed as HTML
+        const content = document.createElement('div');
+        content.style.cssText = 'display: flex; align-items: center; justify-content: space-between;';
+        const text = document.createElement('span');
+        text.textContent = message;
+        const close = document.createElement('button');
+        close.style.cssText = 'background: none; border: none; color: inherit; font-size: 1.2rem; cursor: pointer;';
+        close.textContent = '×';
+        close.addEventListener('click', () => notification.remove());
+        content.append(text, close);
+        notification.appendChild(content);
         
         document.getElementById('notification-container').appendChild(notification);
         
@@ -190,6 +192,11 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 5000);
     }
     
+    // Notifications requested through window.showNotification
+    document.addEventListener('showNotification', event => {
+        showNotification(event.detail.message, event.detail.type);
+    });
+    
     // Simple search functionality
     const searchInput = document.getElementById('searchInput');
     if (searchInput) {
@@ -265,4 +272,22 @@ window.showNotification = function(message, type) {
         detail: { message, type }
     });
     document.dispatchEvent(event);
-}; 
\ No newline at end of file
+}; 
+// Subscribe to /events. `handlers` maps event names (item_added, items_removed,
+// items_updated, expiry, changed, resync) to callbacks taking the parsed data;
+// `handlers.default` receives every event without its own handler.
+window.liveUpdates = function(handlers) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const source = new EventSource('/events');
+    ['item_added', 'items_removed', 'items_updated', 'expiry', 'changed', 'resync'].forEach(name => {
+        source.addEventListener(name, event => {
+            const handler = handlers[name] || handlers.default;
+            if (handler) {
+                handler(JSON.parse(event.data), name);
+            }
+        });
+    });
+    return source;
+};
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import threading
+import time
+import numpy as np
+from models import db, Item
+
+
+class SurplusWindow:
+    """Rolling per-name quantity sums for one user's last ``window`` of additions.
+
+    Every change is kept as an ``(added_date, seq, name, delta)`` event in a
+    min-heap keyed by the item's ``added_date``. Removals and quantity edits are
+    recorded as negative/positive deltas against the same ``added_date``, so they
+    leave the window together with the row they correct and ``expire`` only ever
+    has to pop from the front of the heap.
+    """
+
+    def __init__(self, window, threshold, events=(), totals=None):
+        self.window = window
+        self.threshold = threshold
+        self.events = list(events)
+        heapq.heapify(self.events)
+        self.totals = totals if totals is not None else {}
+        self.built_at = time.monotonic()
+        self._seq = itertools.count(len(self.events))
+
+    def record(self, added_date, name, delta, now=None):
+        now = now or datetime.now()
+        if delta == 0 or added_date is None or added_date < now - self.window:
+            return
+        heapq.heappush(self.events, (added_date, next(self._seq), name, delta))
+        self.totals[name] = self.totals.get(name, 0) + delta
+
+    def expire(self, now=None):
+        window_start = (now or datetime.now()) - self.window
+        events = self.events
+        while events and events[0][0] < window_start:
+            _, _, name, delta = heapq.heappop(events)
+            remaining = self.totals.get(name, 0) - delta
+            if remaining:
+                self.totals[name] = remaining
+            else:
+                self.totals.pop(name, None)
+
+    def surplus(self, now=None):
+        self.expire(now)
+        return sorted(name for name, total in self.totals.items() if total > self.threshold)
+
+
+class SurplusEngine:
+    """Per-process cache of each user's :class:`SurplusWindow`.
+
+    Windows are built with one filtered query and a NumPy pass, then kept up to
+    date by the item write paths. Because each gunicorn worker has its own
+    engine, a window is also rebuilt once it is older than ``max_age`` seconds so
+    writes handled by other workers are picked up.
+    """
+
+    def __init__(self, window_days=7, threshold=10, max_age=60):
+        self.window = timedelta(days=window_days)
+        self.threshold = threshold
+        self.max_age = max_age
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.window = timedelta(days=app.config.get('SURPLUS_WINDOW_DAYS', 7))
+        self.threshold = app.config.get('SURPLUS_THRESHOLD', 10)
+        self.max_age = app.config.get('SURPLUS_MAX_AGE', 60)
+        app.extensions['surplus'] = self
+
+    def build(self, user_id, now=None):
+        now = now or datetime.now()
+        rows = (
+            db.session.query(Item.name, Item.quantity, Item.added_date)
+            .filter(Item.user_id == user_id, Item.added_date >= now - self.window)
+            .all()
+        )
+        if not rows:
+            return SurplusWindow(self.window, self.threshold)
+        names, quantities, added_dates = zip(*rows)
+        quantities = np.fromiter(quantities, dtype=np.int64, count=len(rows))
+        unique_names, codes = np.unique(np.array(names, dtype=object), return_inverse=True)
+        sums = np.bincount(codes, weights=quantities, minlength=len(unique_names)).astype(np.int64)
+        totals = {name: int(total) for name, total in zip(unique_names.tolist(), sums.tolist()) if total}
+        order = np.argsort(np.array(added_dates, dtype='datetime64[us]'), kind='stable')
+        # A list sorted on its first element is already a valid heap
+        events = [(added_dates[i], seq, names[i], int(quantities[i])) for seq, i in enumerate(order.tolist())]
+        return SurplusWindow(self.window, self.threshold, events, totals)
+
+    def get(self, user_id):
+        with self._lock:
+            window = self._windows.get(user_id)
+            if window is not None and time.monotonic() - window.built_at <= self.max_age:
+                return window
+        window = self.build(user_id)
+        with self._lock:
+            self._windows[user_id] = window
+        return window
+
+    def surplus_items(self, user_id, now=None):
+        window = self.get(user_id)
+        with self._lock:
+            return window.surplus(now)
+
+    def _record(self, user_id, added_date, name, delta):
+        with self._lock:
+            window = self._windows.get(user_id)
+            if window is not None:
+                window.record(added_date, name, delta)
+
+    def item_added(self, user_id, name, quantity, added_date):
+        self._record(user_id, added_date, name, quantity)
+
+    def item_removed(self, user_id, name, quantity, added_date):
+        self._record(user_id, added_date, name, -quantity)
+
+    def items_removed(self, user_id, removed):
+        """Record rows (with ``name``, ``quantity``, ``added_date``) from a bulk delete.
+
+        ``removed`` is ``None`` when the database could not report the deleted
+        rows, in which case the user's window is simply rebuilt on next read.
+        """
+        if removed is None:
+            self.invalidate(user_id)
+            return
+        for row in removed:
+            self._record(user_id, row.added_date, row.name, -row.quantity)
+
+    def quantities_changed(self, user_id, changes):
+        """Record ``(name, added_date, old_quantity, new_quantity)`` rows from a quantity update.
+
+        ``changes`` is ``None`` for filter-based updates, which do not report
+        the rows they touched; the user's window is then rebuilt on next read.
+        """
+        if changes is None:
+            self.invalidate(user_id)
+            return
+        for name, added_date, old_quantity, new_quantity in changes:
+            self._record(user_id, added_date, name, new_quantity - old_quantity)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(user_id, None)
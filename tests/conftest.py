@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database before it is imported
+DB_FILE = os.path.join(tempfile.mkdtemp(prefix='swt-tests-'), 'test.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DB_FILE
+os.environ['SCHEDULER_ENABLED'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from app import app as flask_app  # noqa: E402
+from models import db, User  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(username='test', email='test@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def queries(app):
+    """List of SQL statements executed while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from models import db, Item, CategoryRollup
+from bulk import import_items, update_quantities
+from expiry import EXPIRED
+from rollup import rebuild_rollups
+
+
+def rollup_totals(user_id):
+    return {r.category: (r.item_count, r.total_quantity, r.expiring_count)
+            for r in CategoryRollup.query.filter_by(user_id=user_id)}
+
+
+def seed(user_id):
+    now = datetime.now()
+    items = [Item(name=f'item-{i}', category=['Dairy', 'Fruit'][i % 2], quantity=5, shelf_life=3,
+                  location='Fridge', added_date=now, expiry_date=now + timedelta(days=3 + i), user_id=user_id)
+             for i in range(20)]
+    db.session.add_all(items)
+    db.session.commit()
+    rebuild_rollups(user_id)
+    db.session.commit()
+    return [item.id for item in items]
+
+
+def expected_totals(user_id):
+    rebuild_rollups(user_id)
+    db.session.commit()
+    return rollup_totals(user_id)
+
+
+def test_update_by_id_adjusts_rollup_without_rebuild(user_id, queries):
+    ids = seed(user_id)
+    queries.clear()
+    assert update_quantities(user_id, delta=-7, ids=ids[:3])[0] == 3
+    assert not any('GROUP BY' in statement for statement in queries)
+    assert update_quantities(user_id, quantity=12, ids=ids[3:5])[0] == 2
+    incremental = rollup_totals(user_id)
+    assert incremental == expected_totals(user_id)
+    assert incremental['Dairy'][1] == 10 * 5 - 5 - 5 + 7
+
+
+def test_update_by_filter_rebuilds_rollup(user_id):
+    seed(user_id)
+    assert update_quantities(user_id, delta=2, category='Fruit') == (10, None)
+    assert rollup_totals(user_id) == expected_totals(user_id)
+
+
+def test_import_converts_offset_dates_to_local_time_and_rejects_bad_ones(user_id):
+    rows = [
+        (1, {'name': 'Milk', 'category': 'Dairy', 'quantity': '1', 'shelf_life': '7', 'location': 'Fridge',
+             'added_date': '2024-01-01T00:00:00+00:00'}),
+        (2, {'name': 'Eggs', 'category': 'Dairy', 'quantity': '1', 'shelf_life': '7', 'location': 'Fridge',
+             'added_date': '9999-12-31T00:00:00'}),
+    ]
+    summary = import_items(rows, user_id)
+    assert (summary['imported'], summary['failed']) == (1, 1)
+    assert summary['errors'][0].startswith('line 2:')
+    item = Item.query.filter_by(user_id=user_id).one()
+    utc = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert item.added_date == utc.astimezone().replace(tzinfo=None)
+    assert item.expiry_status == EXPIRED
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from models import db, Item, ExpiryEvent
+from expiry import sweep_expiry, FRESH, EXPIRING, EXPIRED
+
+
+def add_item(user_id, expiry_date, status=FRESH, item_id=None):
+    item = Item(id=item_id, name='Milk', category='Dairy', quantity=1, shelf_life=7, location='Fridge',
+                added_date=expiry_date - timedelta(days=7), expiry_date=expiry_date, expiry_status=status,
+                user_id=user_id)
+    db.session.add(item)
+    db.session.commit()
+    return item.id
+
+
+def status(item_id):
+    return db.session.get(Item, item_id).expiry_status
+
+
+def test_sweep_moves_only_items_whose_state_is_due(user_id):
+    now = datetime.now()
+    expiring = add_item(user_id, now + timedelta(days=3))
+    fresh = add_item(user_id, now + timedelta(days=30))
+    expired = add_item(user_id, now - timedelta(hours=2), EXPIRING)
+    events = sweep_expiry(now)
+    assert sorted((e.item_id, e.state) for e in events) == [(expiring, EXPIRING), (expired, EXPIRED)]
+    assert status(fresh) == FRESH
+
+
+def test_sweep_picks_up_rows_committed_out_of_id_order(user_id):
+    now = datetime.now()
+    later = add_item(user_id, now + timedelta(days=3), item_id=100)
+    assert status(later) == FRESH
+    sweep_expiry(now)
+    assert status(later) == EXPIRING
+    # A lower id committed after the sweep, as with PostgreSQL sequences
+    earlier = add_item(user_id, now + timedelta(days=3), item_id=50)
+    sweep_expiry(now)
+    assert status(earlier) == EXPIRING
+
+
+def test_sweep_moves_overdue_fresh_items_straight_to_expired(user_id):
+    now = datetime.now()
+    item_id = add_item(user_id, now - timedelta(hours=1))
+    sweep_expiry(now)
+    assert status(item_id) == EXPIRED
+    assert [e.state for e in ExpiryEvent.query.order_by(ExpiryEvent.id)] == [EXPIRED]
+    assert sweep_expiry(now) == []
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from models import db, Item, WastePrediction
+from forecast import Forecaster, N
+
+
+def add_item(user_id, name, added_date, quantity=1, shelf_life=3, item_id=None):
+    item = Item(id=item_id, name=name, category='Dairy', quantity=quantity, shelf_life=shelf_life, location='Fridge',
+                added_date=added_date, expiry_date=added_date + timedelta(days=shelf_life), user_id=user_id)
+    db.session.add(item)
+    db.session.commit()
+    return item.id
+
+
+def add_history(user_id, name, now):
+    # Small past purchases give a low rate, so a large unexpired lot is at risk
+    for days_ago in (60, 40, 20):
+        add_item(user_id, name, now - timedelta(days=days_ago))
+    return add_item(user_id, name, now - timedelta(days=1), quantity=100, shelf_life=10)
+
+
+def predicted_at(item_id):
+    return db.session.get(WastePrediction, item_id).predicted_at
+
+
+def test_incremental_run_picks_up_rows_committed_out_of_id_order(user_id):
+    now = datetime.now()
+    forecaster = Forecaster(processes=0)
+    add_item(user_id, 'Milk', now - timedelta(days=2), item_id=100)
+    forecaster(now)
+    # A lower id committed after the run, as with PostgreSQL sequences
+    add_item(user_id, 'Milk', now - timedelta(minutes=1), item_id=50)
+    forecaster(now + timedelta(minutes=5))
+    assert forecaster.model.stats[N].sum() == 2
+    # Rows read again within the commit margin are not counted twice
+    forecaster(now + timedelta(minutes=6))
+    assert forecaster.model.stats[N].sum() == 2
+
+
+def test_incremental_run_rescores_only_groups_with_new_purchases(user_id):
+    now = datetime.now()
+    forecaster = Forecaster(processes=0)
+    milk = add_history(user_id, 'Milk', now)
+    bread = add_history(user_id, 'Bread', now)
+    assert forecaster(now) == 2
+    add_item(user_id, 'Bread', now + timedelta(minutes=1))
+    later = now + timedelta(minutes=5)
+    assert forecaster(later) == 1
+    assert predicted_at(milk) == now
+    assert predicted_at(bread) == later
+    # Nothing new: no rescoring at all
+    assert forecaster(later + timedelta(minutes=5)) == 0
+    assert predicted_at(bread) == later
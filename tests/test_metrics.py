@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+from flask import g
+from sqlalchemy import event
+
+from models import db, Item
+from metrics import Metrics
+
+
+def test_rows_are_counted_as_they_are_fetched(app, user_id):
+    now = datetime.now()
+    db.session.add_all(Item(name=f'item-{i}', category='Dairy', quantity=1, shelf_life=7, location='Fridge',
+                            added_date=now, expiry_date=now + timedelta(days=7), user_id=user_id)
+                       for i in range(30))
+    db.session.commit()
+    metrics = Metrics()
+    event.listen(db.engine, 'before_cursor_execute', metrics._before_cursor_execute)
+    event.listen(db.engine, 'after_cursor_execute', metrics._after_cursor_execute)
+    try:
+        with app.test_request_context():
+            metrics._before_request()
+            assert len(db.session.query(Item.id, Item.name).all()) == 30
+            assert g.metrics['rows'] == 30
+            # A streamed result only counts the rows actually consumed
+            result = db.session.execute(db.select(Item.id).execution_options(yield_per=10))
+            next(result)
+            assert g.metrics['rows'] == 40
+            result.close()
+            assert g.metrics['queries'] == 2
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', metrics._before_cursor_execute)
+        event.remove(db.engine, 'after_cursor_execute', metrics._after_cursor_execute)
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Item
+from recommend import build_recommendations, first_item_by_name
+
+
+def add_items(user_id, names, category='Dairy', copies=2):
+    now = datetime.now()
+    db.session.add_all(
+        Item(name=name, category=category, quantity=1, shelf_life=30, location='Fridge', added_date=now,
+             expiry_date=now + timedelta(days=30), user_id=user_id)
+        for _ in range(copies) for name in names
+    )
+    db.session.commit()
+
+
+@pytest.mark.parametrize('n_names', [10, 5000])
+def test_first_item_by_name_is_one_query(user_id, queries, n_names):
+    names = [f'item-{i}' for i in range(n_names)]
+    add_items(user_id, names)
+    queries.clear()
+    found = first_item_by_name(user_id, names)
+    assert len(queries) == 1
+    assert set(found) == set(names)
+    first_ids = dict(db.session.query(Item.name, db.func.min(Item.id)).group_by(Item.name).all())
+    assert all(found[name].id == first_ids[name] for name in names)
+
+
+def test_first_item_by_name_ignores_other_names_and_users(user_id, queries):
+    add_items(user_id, ['Milk', 'Eggs'])
+    add_items(user_id + 1, ['Bread'])
+    assert set(first_item_by_name(user_id, ['Milk', 'Bread'])) == {'Milk'}
+
+
+@pytest.mark.parametrize('n_names', [10, 5000])
+def test_build_recommendations_query_count_is_constant(user_id, queries, n_names):
+    names = [f'item-{i}' for i in range(n_names)]
+    add_items(user_id, names[::2], category='Canned')
+    add_items(user_id, names[1::2])
+    queries.clear()
+    recs, counts = build_recommendations(user_id, [], names)
+    assert len(queries) == 1
+    assert counts['recycle_count'] == len(names[::2])
+    assert counts['repurpose_count'] == len(names[1::2])
+    assert len(recs) == n_names
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from models import db, Item
+from bulk import update_quantities
+from surplus import SurplusEngine
+
+
+def add_item(user_id, name, quantity, days_ago):
+    added_date = datetime.now() - timedelta(days=days_ago)
+    item = Item(name=name, category='Dairy', quantity=quantity, shelf_life=30, location='Fridge',
+                added_date=added_date, expiry_date=added_date + timedelta(days=30), user_id=user_id)
+    db.session.add(item)
+    db.session.commit()
+    return item.id
+
+
+def test_quantity_edits_update_the_window_without_a_rebuild(user_id, queries):
+    engine = SurplusEngine(window_days=7, threshold=10)
+    milk = add_item(user_id, 'Milk', 6, days_ago=1)
+    add_item(user_id, 'Milk', 3, days_ago=2)
+    bread = add_item(user_id, 'Bread', 4, days_ago=0)
+    old = add_item(user_id, 'Bread', 50, days_ago=30)
+    assert engine.surplus_items(user_id) == []
+    engine.quantities_changed(user_id, update_quantities(user_id, quantity=9, ids=[milk])[1])
+    engine.quantities_changed(user_id, update_quantities(user_id, delta=20, ids=[bread, old])[1])
+    queries.clear()
+    assert engine.surplus_items(user_id) == ['Bread', 'Milk']
+    assert not queries
+    assert engine.get(user_id).totals == engine.build(user_id).totals
+
+
+def test_filtered_quantity_edits_rebuild_the_window(user_id):
+    engine = SurplusEngine(window_days=7, threshold=10)
+    add_item(user_id, 'Milk', 6, days_ago=1)
+    assert engine.surplus_items(user_id) == []
+    engine.quantities_changed(user_id, update_quantities(user_id, quantity=11, category='Dairy')[1])
+    assert engine.surplus_items(user_id) == ['Milk']